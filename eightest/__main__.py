@@ -0,0 +1,18 @@
+import sys
+
+from eightest import benchmark, distributed, report, runner
+
+
+def main():
+    if sys.argv[1:2] == ['worker']:
+        distributed.argsparser(sys.argv[2:])
+    elif sys.argv[1:2] == ['merge']:
+        report.argsparser(sys.argv[2:])
+    elif sys.argv[1:2] == ['bench']:
+        benchmark.argsparser(sys.argv[2:])
+    else:
+        runner.argsparser()
+
+
+if __name__ == "__main__":
+    main()
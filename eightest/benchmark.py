@@ -0,0 +1,450 @@
+import os
+import sys
+import time
+import shutil
+import psutil
+import pathlib
+import platform
+import tempfile
+import subprocess
+
+from typing import Dict, List, Optional
+from eightest.events import EventStream
+from eightest.logger import LogWriter, eLogger
+from eightest.report import load_report, save_report
+from eightest.runner import Runner
+from eightest.searcher import create_tree
+from eightest.testcase import Status
+from eightest.usage import UsageMeter
+from eightest.utilities import DOTENV_PATH, ROOT_ENV, get_time
+
+# Numbers of tests of generated trees.
+SIZES = (1, 100, 10000, 100000)
+# Bodies of generated tests.
+BODIES = {
+    'noop': 'pass',
+    'sleep': 'time.sleep(0.01)',
+    'cpu': 'sum(number * number for number in range(200000))'
+}
+# Number of tests in each generated module.
+TESTS_PER_MODULE = 100
+# Largest tree which is also executed, bigger ones are only
+# discovered and dispatched.
+RUN_LIMIT = 1000
+# Number of tests whose logging is measured.
+LOGGING_SAMPLES = 200
+# Folder tests write their end times to, relative to tree root.
+MARKS_DIR = 'marks'
+# Folder containing eightest package, put on path of measured runs.
+PACKAGE_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+MODULE_HEADER = f'''import os
+import time
+from eightest import TestCase
+
+
+def mark(test_name):
+    with open(os.path.join({MARKS_DIR!r}, test_name), 'w') as file:
+        file.write(repr(time.time()))
+'''
+
+TEST_TEMPLATE = '''
+    def {test_name}(self):
+        {body}
+        mark({test_name!r})
+'''
+
+
+class TimedEvents(EventStream):
+    """
+    Event stream which records when result
+    of each test reached the runner.
+    """
+    def __init__(self) -> None:
+        super(TimedEvents, self).__init__()
+        self.finished: Dict[str, float] = {}
+
+    def publish(self, type: str, data: dict) -> None:
+        """
+        Args:
+            type (str): Event type.
+            data (dict): JSON serializable event data.
+        """
+        if type == 'finish':
+            self.finished[data['test_name']] = time.time()
+        super(TimedEvents, self).publish(type, data)
+
+
+def generate_tree(root: str, size: int, body: str) -> None:
+    """
+    Writes synthetic project with config file and test
+    folder of given number of tests. Each test writes its
+    end time into MARKS_DIR after its body.
+
+    Args:
+        root (str): Project root folder.
+        size (int): Number of tests.
+        body (str): Key of BODIES.
+    """
+    folder_path = os.path.join(root, 'tests')
+    os.makedirs(folder_path)
+    os.makedirs(os.path.join(root, MARKS_DIR))
+    shutil.copy(DOTENV_PATH, os.path.join(root, 'config.env'))
+    open(os.path.join(folder_path, '__init__.py'), 'w').close()
+
+    for start in range(0, size, TESTS_PER_MODULE):
+        number = start // TESTS_PER_MODULE
+        source = [MODULE_HEADER, f'\n\nclass TestBench{number}(TestCase):\n']
+        for index in range(start, min(start + TESTS_PER_MODULE, size)):
+            source.append(TEST_TEMPLATE.format(test_name=f'test_bench_{index}',
+                                               body=BODIES[body]))
+
+        module_path = os.path.join(folder_path, f'test_bench_{number:05d}.py')
+        with open(module_path, 'w', encoding='utf-8') as file:
+            file.write(''.join(source))
+
+
+def summarize(values: List[float]) -> Optional[dict]:
+    """
+    Args:
+        values (List[float]): Measured values.
+
+    Returns:
+        dict | None: Mean, median, 95th percentile
+        and maximum, None when there are no values.
+    """
+    if not values:
+        return None
+
+    values = sorted(values)
+    return {
+        "mean": sum(values) / len(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(int(len(values) * 0.95), len(values) - 1)],
+        "max": values[-1]
+    }
+
+
+def folder_size(folder_path: str) -> int:
+    """
+    Args:
+        folder_path (str): Particular folder.
+
+    Returns:
+        int: Size of all files in the folder in bytes.
+    """
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(folder_path)
+               for name in files)
+
+
+def measure_scenario(size: int, mode: str, run_limit: int) -> dict:
+    """
+    Measures stages of the runner on tree of current folder.
+    Discovery is measured without and with discovery cache.
+    Tree up to run_limit tests is also executed, per-test
+    overhead is time of slots not spent in test bodies and
+    collection latency is time from end of test body to its
+    result being completed by the runner.
+
+    Args:
+        size (int): Number of tests of the tree.
+        mode (str): Execution mode, either "process" or "pool".
+        run_limit (int): Largest tree which is executed.
+
+    Returns:
+        dict: Measured times in seconds and sizes in bytes.
+    """
+    process = psutil.Process()
+    rss = {"baseline": process.memory_info().rss}
+
+    start = time.perf_counter()
+    tree = create_tree(None, use_cache=False)
+    cold = time.perf_counter() - start
+    create_tree(None)
+    start = time.perf_counter()
+    create_tree(None)
+    warm = time.perf_counter() - start
+    rss['tree'] = process.memory_info().rss
+    del tree
+
+    runner = Runner(mode=mode)
+    events = runner.tasks.events = TimedEvents()
+    start = time.perf_counter()
+    runner.dispatch_tasks()
+    dispatch = time.perf_counter() - start
+    rss['dispatch'] = process.memory_info().rss
+
+    result = {
+        "create_tree": {"cold": cold, "warm": warm},
+        "dispatch_tasks": dispatch,
+        "rss": rss,
+        "execution": None
+    }
+    if size > run_limit:
+        return result
+
+    meter = UsageMeter()
+    meter.start()
+    start = time.perf_counter()
+    runner.run_tests()
+    wall = time.perf_counter() - start
+    usage = meter.stop()
+    rss['peak'] = usage.peak_rss
+
+    busy = sum(task.result.duration for task in runner.tasks.completed
+               if task.result.duration is not None)
+    slots = min(runner.get_concurrency(), size)
+    latencies = []
+    for test_name, finished in events.finished.items():
+        with open(os.path.join(MARKS_DIR, test_name)) as file:
+            latencies.append(finished - float(file.read()))
+
+    result['execution'] = {
+        "wall": wall,
+        "slots": slots,
+        "busy": busy,
+        "overhead_per_test": max(wall * slots - busy, 0) / size,
+        "collection_latency": summarize(latencies),
+        "parent_cpu": usage.user_time + usage.system_time,
+        "log_bytes": folder_size(
+            os.path.join('logs', f'test_session_{runner.session_time}')),
+        "counters": runner.tasks.counters
+    }
+    return result
+
+
+def measure_logging(count: int) -> dict:
+    """
+    Measures logging of a test as done by test process,
+    that is creating logger, start and end records and
+    closing it, with records written directly and with
+    records sent to central log writer.
+
+    Args:
+        count (int): Number of logged tests.
+
+    Returns:
+        dict: Time per test in seconds for each log mode
+        and time log writer needs to drain the records.
+    """
+    session_time = get_time()
+    writer = LogWriter(session_time, console=False)
+    writer.start()
+    result = {}
+
+    for log_mode, address in (('direct', None), ('central', writer.address)):
+        start = time.perf_counter()
+        for number in range(count):
+            log = eLogger(f'test_log_{number}', session_time,
+                          log_address=address)
+            run = time.perf_counter()
+            log.start()
+            log.end(run, Status.PASSED, 1)
+            log.close()
+        result[log_mode] = (time.perf_counter() - start) / count
+
+    start = time.perf_counter()
+    writer.stop()
+    result['central_drain'] = time.perf_counter() - start
+    return result
+
+
+def run_isolated(root: str, *args: str) -> dict:
+    """
+    Runs measurement in fresh interpreter with given folder
+    as project root, so that caches, logs and result store
+    of the measured run stay there and RSS is not affected
+    by previous measurements.
+
+    Args:
+        root (str): Project root folder.
+        args (str): Command of measurement and its arguments.
+
+    Raises:
+        RuntimeError: When measurement fails.
+
+    Returns:
+        dict: Measurement result.
+    """
+    output = os.path.join(root, 'result.json')
+    env = {**os.environ, ROOT_ENV: root}
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (root, str(PACKAGE_DIR), env.get('PYTHONPATH'))))
+
+    with open(os.path.join(root, 'output.log'), 'w+') as console:
+        process = subprocess.run(
+            [sys.executable, '-m', 'eightest.benchmark', *args, output],
+            cwd=root, env=env, stdout=console, stderr=subprocess.STDOUT)
+        if process.returncode != 0:
+            console.seek(0)
+            raise RuntimeError(f'Measurement {args} failed:\n' +
+                               ''.join(console.readlines()[-20:]))
+
+    return load_report(output)
+
+
+def run_benchmark(sizes: List[int] = SIZES,
+                  bodies: List[str] = tuple(BODIES),
+                  mode: str = 'process',
+                  run_limit: int = RUN_LIMIT
+                  ) -> dict:
+    """
+    Measures runner overhead on generated tree for every
+    combination of size and body, each in its own folder.
+
+    Args:
+        sizes (List[int], optional): Numbers of tests.
+        bodies (List[str], optional): Keys of BODIES.
+        mode (str, optional): Execution mode, either "process" or "pool".
+        run_limit (int, optional): Largest tree which is executed.
+
+    Returns:
+        dict: JSON serializable benchmark results.
+    """
+    results = {
+        "created": get_time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "mode": mode,
+        "run_limit": run_limit,
+        "logging": None,
+        "scenarios": []
+    }
+
+    with tempfile.TemporaryDirectory(prefix='eightest-bench-') as root:
+        shutil.copy(DOTENV_PATH, os.path.join(root, 'config.env'))
+        results['logging'] = run_isolated(root, 'logging',
+                                          str(LOGGING_SAMPLES))
+
+    for size in sizes:
+        for body in bodies:
+            with tempfile.TemporaryDirectory(prefix='eightest-bench-') as root:
+                generate_tree(root, size, body)
+                scenario = run_isolated(root, 'scenario', str(size), mode,
+                                        str(run_limit))
+            results['scenarios'].append({"size": size, "body": body,
+                                         **scenario})
+
+    return results
+
+
+def flatten(entry: dict, prefix: str = '') -> Dict[str, float]:
+    """
+    Args:
+        entry (dict): Nested measurements.
+        prefix (str, optional): Dotted name of the entry.
+
+    Returns:
+        Dict[str, float]: Numeric measurements by dotted name.
+    """
+    metrics = {}
+    for name, value in entry.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f'{prefix}{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[f'{prefix}{name}'] = value
+    return metrics
+
+
+def compare(results: dict, baseline: dict) -> List[str]:
+    """
+    Args:
+        results (dict): Current benchmark results.
+        baseline (dict): Results to compare to.
+
+    Returns:
+        List[str]: Relative change of each measurement
+        present in both results.
+    """
+    def index(results: dict) -> Dict[str, float]:
+        metrics = flatten(results['logging'] or {}, 'logging.')
+        for scenario in results['scenarios']:
+            label = f"{scenario['size']}/{scenario['body']} "
+            metrics.update(flatten({key: value
+                                    for key, value in scenario.items()
+                                    if key not in ('size', 'body')}, label))
+        return metrics
+
+    current, previous = index(results), index(baseline)
+    output = []
+    for name, value in current.items():
+        if (old := previous.get(name)) is None:
+            continue
+        change = f'{(value - old) * 100 / old:+.1f}%' if old else 'n/a'
+        output.append(f'{name}: {old:.6g} -> {value:.6g} ({change})')
+    return output
+
+
+def summary(results: dict) -> List[str]:
+    """
+    Args:
+        results (dict): Benchmark results.
+
+    Returns:
+        List[str]: Main measurements in form of str outputs.
+    """
+    output = []
+    for scenario in results['scenarios']:
+        line = (f"Tests: {scenario['size']} Body: {scenario['body']} " +
+                f"Discovery: {scenario['create_tree']['cold']:.4f}s/" +
+                f"{scenario['create_tree']['warm']:.4f}s " +
+                f"Dispatch: {scenario['dispatch_tasks']:.4f}s")
+        if execution := scenario['execution']:
+            line += (f" Wall: {execution['wall']:.2f}s " +
+                     f"Overhead: {execution['overhead_per_test']:.4f}s/test")
+        output.append(line)
+    return output
+
+
+def argsparser(args: List[str] = None) -> None:
+    import pprint
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='eightest bench')
+    parser.add_argument('--sizes', metavar='N', type=int, nargs='+',
+                        default=list(SIZES), help='numbers of tests')
+    parser.add_argument('--bodies', nargs='+', choices=list(BODIES),
+                        default=list(BODIES), help='bodies of tests')
+    parser.add_argument('-m', '--mode', choices=['process', 'pool'],
+                        default='process', help='execution mode')
+    parser.add_argument('--run-limit', metavar='N', type=int,
+                        default=RUN_LIMIT,
+                        help='largest tree which is also executed')
+    parser.add_argument('-o', metavar='FILE', default='benchmark.json',
+                        help='file results are written to')
+    parser.add_argument('--baseline', metavar='FILE', default=None,
+                        help='results to compare to')
+    args = parser.parse_args(args)
+
+    results = run_benchmark(args.sizes, args.bodies, args.mode,
+                            args.run_limit)
+    save_report(results, args.o)
+    pprint.pprint(summary(results))
+    if args.baseline is not None:
+        pprint.pprint(compare(results, load_report(args.baseline)))
+
+
+def measure(args: List[str]) -> None:
+    """
+    Entry point of isolated measurement, writes
+    its result into file given as last argument.
+
+    Args:
+        args (List[str]): Command, its arguments and output file.
+    """
+    command, *arguments, output = args
+    if command == 'logging':
+        result = measure_logging(int(arguments[0]))
+    else:
+        size, mode, run_limit = arguments
+        result = measure_scenario(int(size), mode, int(run_limit))
+    save_report(result, output)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] in (['scenario'], ['logging']):
+        measure(sys.argv[1:])
+    else:
+        argsparser()
@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+
+from typing import Dict, Optional
+from eightest.utilities import CACHE_DIR, ROOT_DIR
+
+
+class DiscoveryCache(object):
+    """
+    Persistent index of discovered tests. Each test module
+    entry is keyed by its path and validated with file
+    mtime, size and content hash, so that only modules
+    changed since the last run have to be parsed again.
+    """
+    VERSION = 3
+
+    def __init__(self,
+                 cache_dir: str = CACHE_DIR,
+                 name: str = 'discovery.json'
+                 ) -> None:
+        """
+        Args:
+            cache_dir (str, optional): Cache folder path.
+            name (str, optional): Index file name.
+        """
+        self.path = os.path.join(cache_dir, name)
+        self._modules: Dict[str, dict] = {}
+        self._seen: Dict[str, dict] = {}
+        self._changed = False
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads index from disk, corrupted or outdated
+        index is ignored and rebuilt.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == DiscoveryCache.VERSION:
+            self._modules = data.get('modules', {})
+
+    def get(self, module: str) -> Optional[dict]:
+        """
+        Returns cached entry of module if file has not changed.
+        When only mtime differs, content hash decides.
+
+        Args:
+            module (str): Module path relative to root folder.
+
+        Returns:
+            dict | None: Cached entry, None when module must be parsed.
+        """
+        if (record := self._modules.get(module)) is None:
+            return None
+
+        stat = os.stat(os.path.join(ROOT_DIR, module))
+        if stat.st_size != record['size']:
+            return None
+
+        if stat.st_mtime_ns != record['mtime']:
+            if self._hash(module) != record['hash']:
+                return None
+            record['mtime'] = stat.st_mtime_ns
+            self._changed = True
+
+        self._seen[module] = record
+        return record['entry']
+
+    def set(self, module: str, entry: dict) -> None:
+        """
+        Stores parsed tests of module along with its file signature.
+
+        Args:
+            module (str): Module path relative to root folder.
+            entry (dict): Parsed test entry of the module.
+        """
+        stat = os.stat(os.path.join(ROOT_DIR, module))
+        self._seen[module] = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': self._hash(module),
+            'entry': entry
+        }
+        self._changed = True
+
+    def save(self) -> None:
+        """
+        Writes index to disk if anything has changed.
+        Modules not found during this discovery are dropped.
+        """
+        if not self._changed and self._seen.keys() == self._modules.keys():
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': DiscoveryCache.VERSION,
+                       'modules': self._seen}, file)
+
+        os.replace(temp_path, self.path)
+        self._modules = self._seen
+        self._seen = {}
+        self._changed = False
+
+    def _hash(self, module: str) -> str:
+        """
+        Args:
+            module (str): Module path relative to root folder.
+
+        Returns:
+            str: SHA-256 digest of module content.
+        """
+        with open(os.path.join(ROOT_DIR, module), 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
@@ -0,0 +1,120 @@
+import time
+import psutil
+
+from typing import Optional
+from multiprocess import Semaphore
+
+
+class ConcurrencyController(object):
+    """
+    Adapts number of tests running at the same time to
+    live system load. Limit goes down by one when CPU is
+    saturated or iowait is high and is halved when memory
+    runs out or system swaps. It goes up by one when CPU
+    has spare capacity and all allowed tests are running.
+    Load is sampled at most once per INTERVAL.
+    """
+    # Minimal interval between load samples in seconds.
+    INTERVAL = 1.0
+    # Busy CPU percentage above which limit is lowered.
+    CPU_HIGH = 90.0
+    # Busy CPU percentage below which limit may be raised.
+    CPU_LOW = 70.0
+    # Percentage of CPU time waiting for I/O considered saturation.
+    IOWAIT_HIGH = 20.0
+    # Percentage of available memory considered shortage.
+    MEMORY_LOW = 10.0
+
+    def __init__(self, minimum: int, maximum: int, initial: int) -> None:
+        """
+        Args:
+            minimum (int): Lowest allowed limit.
+            maximum (int): Highest allowed limit.
+            initial (int): Limit at the start of the session.
+        """
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self._semaphore: Optional[Semaphore] = None
+        self._held = 0
+        self._sampled = time.monotonic()
+        self._swapped = psutil.swap_memory().sin
+        # First call starts measuring CPU times.
+        psutil.cpu_times_percent(interval=None)
+
+    def attach(self, semaphore: Semaphore) -> None:
+        """
+        Keeps limit in effect on semaphore of test processes,
+        which has maximum permits, by holding the ones above it.
+
+        Args:
+            semaphore (Semaphore): Semaphore created with maximum value.
+        """
+        self._semaphore = semaphore
+        self._held = 0
+        self._sync()
+
+    def update(self, running: int) -> int:
+        """
+        Samples system load when INTERVAL has passed
+        and adjusts limit accordingly.
+
+        Args:
+            running (int): Number of tests running now.
+
+        Returns:
+            int: Number of tests allowed to run at the same time.
+        """
+        now = time.monotonic()
+        if now - self._sampled >= ConcurrencyController.INTERVAL:
+            self._sampled = now
+            self.limit = self.adjust(running)
+        self._sync()
+        return self.limit
+
+    def adjust(self, running: int) -> int:
+        """
+        Args:
+            running (int): Number of tests running now.
+
+        Returns:
+            int: New limit based on current load.
+        """
+        times = psutil.cpu_times_percent(interval=None)._asdict()
+        # Guest time is already included in user time.
+        total = sum(value for name, value in times.items()
+                    if not name.startswith('guest')) or 100.0
+        iowait = times.get('iowait', 0.0) * 100 / total
+        busy = 100.0 - times['idle'] * 100 / total - iowait
+        memory = psutil.virtual_memory()
+        swapped = psutil.swap_memory().sin
+        swapping = swapped > self._swapped
+        self._swapped = swapped
+
+        limit = self.limit
+        if (memory.available * 100 / memory.total
+           < ConcurrencyController.MEMORY_LOW or swapping):
+            limit //= 2
+        elif (busy > ConcurrencyController.CPU_HIGH
+              or iowait > ConcurrencyController.IOWAIT_HIGH):
+            limit -= 1
+        elif busy < ConcurrencyController.CPU_LOW and running >= limit:
+            limit += 1
+
+        return min(max(limit, self.minimum), self.maximum)
+
+    def _sync(self) -> None:
+        """
+        Takes or gives back semaphore permits so that
+        limit permits are left to test processes. Permits
+        taken by running tests are taken once released.
+        """
+        if self._semaphore is None:
+            return
+
+        excess = self.maximum - self.limit
+        while self._held > excess:
+            self._semaphore.release()
+            self._held -= 1
+        while self._held < excess and self._semaphore.acquire(False):
+            self._held += 1
@@ -1 +1,272 @@
-# file for database operations
\ No newline at end of file
+import os
+import time
+import sqlite3
+
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from eightest.searcher import TestMethod
+from eightest.utilities import DATABASE_PATH
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    log_folder TEXT NOT NULL,
+    mode TEXT,
+    started REAL NOT NULL,
+    finished REAL,
+    total INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    test_key TEXT NOT NULL,
+    test_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL,
+    retries INTEGER,
+    worker INTEGER,
+    started REAL,
+    finished REAL NOT NULL,
+    log_file TEXT
+);
+CREATE TABLE IF NOT EXISTS tests (
+    test_key TEXT PRIMARY KEY,
+    test_name TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    total_duration REAL NOT NULL,
+    avg_duration REAL NOT NULL,
+    last_status TEXT NOT NULL,
+    last_finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE INDEX IF NOT EXISTS results_session ON results (session_id);
+CREATE INDEX IF NOT EXISTS results_test ON results (test_key, finished);
+CREATE INDEX IF NOT EXISTS tests_avg_duration ON tests (avg_duration);
+"""
+
+INSERT_RESULT = """
+INSERT INTO results (session_id, test_key, test_name, status, duration,
+                     retries, worker, started, finished, log_file)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Per-test summary keeps slowest tests query on a single index.
+UPSERT_TEST = """
+INSERT INTO tests (test_key, test_name, runs, total_duration,
+                   avg_duration, last_status, last_finished)
+VALUES (?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (test_key) DO UPDATE SET
+    test_name = excluded.test_name,
+    runs = runs + 1,
+    total_duration = total_duration + excluded.total_duration,
+    avg_duration = (total_duration + excluded.total_duration) / (runs + 1),
+    last_status = excluded.last_status,
+    last_finished = excluded.last_finished
+"""
+
+
+class ResultStore(object):
+    """
+    Local SQLite store of test sessions and their results.
+    Results are buffered and written in batched transactions,
+    at most every FLUSH_INTERVAL or BATCH_SIZE results.
+    """
+    # Maximum number of buffered results.
+    BATCH_SIZE = 100
+    # Maximum age of buffered results in seconds.
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path: str = DATABASE_PATH) -> None:
+        """
+        Args:
+            path (str, optional): Database file path.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.session_id: Optional[int] = None
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = Lock()
+        self._buffer: List[tuple] = []
+        self._flushed = time.monotonic()
+
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute('PRAGMA foreign_keys=ON')
+            self._connection.executescript(SCHEMA)
+
+    def begin_session(self, session_time: str, mode: str, total: int) -> int:
+        """
+        Records start of a test session, results added
+        afterwards belong to it.
+
+        Args:
+            session_time (str): Test Session start time.
+            mode (str): Execution mode.
+            total (int): Number of tests to be executed.
+
+        Returns:
+            int: Session ID.
+        """
+        self.flush()
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO sessions (log_folder, mode, started, total) '
+                'VALUES (?, ?, ?, ?)',
+                (f'test_session_{session_time}', mode, time.time(), total))
+        self.session_id = cursor.lastrowid
+        return self.session_id
+
+    def add_result(self,
+                   test_method: TestMethod,
+                   result,
+                   worker: Optional[int],
+                   started: Optional[float],
+                   finished: float
+                   ) -> None:
+        """
+        Buffers result of a completed test.
+
+        Args:
+            test_method (TestMethod): Executed test.
+            result (Result): Its result.
+            worker (int | None): PID of process which executed it.
+            started (float | None): Wall clock time of test start.
+            finished (float): Wall clock time of test end.
+        """
+        self._buffer.append((self.session_id,
+                             test_method.key,
+                             test_method.name,
+                             result.status.name,
+                             result.duration,
+                             result.retries,
+                             worker,
+                             started,
+                             finished,
+                             f'{test_method.name}.log'))
+
+        if (len(self._buffer) >= ResultStore.BATCH_SIZE or
+           time.monotonic() - self._flushed >= ResultStore.FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered results in a single transaction.
+        """
+        self._flushed = time.monotonic()
+        if not self._buffer:
+            return
+
+        rows, self._buffer = self._buffer, []
+        tests = [(row[1], row[2], row[4] or 0, row[4] or 0, row[3], row[8])
+                 for row in rows]
+
+        with self._lock, self._connection:
+            self._connection.executemany(INSERT_RESULT, rows)
+            self._connection.executemany(UPSERT_TEST, tests)
+
+    def finish_session(self, counters: Dict[str, int]) -> None:
+        """
+        Writes remaining results and final counters of the session.
+
+        Args:
+            counters (Dict[str, int]): Numbers of passed,
+            failed and errored tests.
+        """
+        self.flush()
+        if self.session_id is None:
+            return
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'UPDATE sessions SET finished = ?, passed = ?, '
+                'failed = ?, error = ? WHERE id = ?',
+                (time.time(), counters['passed'], counters['failed'],
+                 counters['error'], self.session_id))
+
+    def last_sessions(self, limit: int = 50) -> List[dict]:
+        """
+        Args:
+            limit (int, optional): Maximum number of sessions.
+
+        Returns:
+            List[dict]: The most recent sessions, newest first.
+        """
+        return self._query('SELECT * FROM sessions '
+                           'ORDER BY started DESC LIMIT ?', (limit,))
+
+    def session_logs(self, session_ids: Iterable[int]) -> Dict[int, List[str]]:
+        """
+        Args:
+            session_ids (Iterable[int]): Particular sessions.
+
+        Returns:
+            Dict[int, List[str]]: Log file names of each session.
+        """
+        session_ids = list(session_ids)
+        logs: Dict[int, List[str]] = {id: [] for id in session_ids}
+        marks = ', '.join('?' * len(session_ids))
+
+        for row in self._query('SELECT DISTINCT session_id, log_file '
+                               f'FROM results WHERE session_id IN ({marks}) '
+                               'ORDER BY log_file', session_ids):
+            logs[row['session_id']].append(row['log_file'])
+        return logs
+
+    def log_folders(self) -> Set[str]:
+        """
+        Returns:
+            Set[str]: Log folders of all recorded sessions.
+        """
+        return {row['log_folder']
+                for row in self._query('SELECT log_folder FROM sessions')}
+
+    def test_history(self, test_key: str, limit: int = 50) -> List[dict]:
+        """
+        Args:
+            test_key (str): Test key, module path, class and name.
+            limit (int, optional): Maximum number of results.
+
+        Returns:
+            List[dict]: The most recent results of the test, newest first.
+        """
+        return self._query('SELECT * FROM results WHERE test_key = ? '
+                           'ORDER BY finished DESC LIMIT ?',
+                           (test_key, limit))
+
+    def slowest_tests(self, limit: int = 20) -> List[dict]:
+        """
+        Args:
+            limit (int, optional): Maximum number of tests.
+
+        Returns:
+            List[dict]: Tests with the longest average duration.
+        """
+        return self._query('SELECT * FROM tests '
+                           'ORDER BY avg_duration DESC LIMIT ?', (limit,))
+
+    def failed_tests(self) -> Set[str]:
+        """
+        Returns:
+            Set[str]: Keys of tests whose last run has not passed.
+        """
+        return {row['test_key'] for row in self._query(
+            'SELECT test_key FROM tests WHERE last_status IN (?, ?, ?)',
+            ('FAILED', 'ERROR', 'TIMEOUT'))}
+
+    def _query(self, sql: str, parameters: Tuple = ()) -> List[dict]:
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """
+        Writes buffered results and closes database.
+        """
+        self.flush()
+        self._connection.close()
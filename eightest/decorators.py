@@ -1,7 +1,11 @@
+import os
+import csv
+import json
 import inspect
 import functools
 
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator, Union
+from eightest.utilities import ROOT_DIR
 
 
 class Template(object):
@@ -57,5 +61,122 @@ class Template(object):
         return decorator
 
 
+def timeout(seconds: float) -> Callable:
+    """
+    Overrides PROCESS_TIMEOUT for decorated test. The value
+    is read during test discovery, so it has to be
+    given as a number literal, e.g. @timeout(60).
+
+    Args:
+        seconds (float): Test timeout in seconds.
+
+    Returns:
+        Callable: Decorator returning test method unchanged.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.timeout = seconds
+        return func
+
+    return decorator
+
+
+class Parameters(object):
+    """
+    Cases of parametrized test. Source is read only when
+    cases are generated, one case at a time, so that large
+    sources are never loaded whole.
+    """
+    def __init__(self,
+                 names: str,
+                 source: Union[Iterable, Callable[[], Iterable], str]
+                 ) -> None:
+        """
+        Args:
+            names (str): Comma separated names of test arguments.
+            source (Iterable | Callable | str): Iterable of cases,
+            callable returning it, e.g. generator function, or path
+            of data file relative to root folder.
+        """
+        self.names = [name.strip() for name in names.split(',')
+                      if name.strip()]
+        self.source = source
+
+    def cases(self) -> Iterator[dict]:
+        """
+        Raises:
+            ValueError: When case does not match argument names.
+
+        Yields:
+            dict: Keyword arguments of the next case.
+        """
+        for values in self.values():
+            if isinstance(values, dict):
+                yield values
+                continue
+
+            if len(values) != len(self.names):
+                raise ValueError(f'Case {values!r} does not match '
+                                 f'arguments {self.names}.')
+            yield dict(zip(self.names, values))
+
+    def values(self) -> Iterator[Union[tuple, dict]]:
+        """
+        Lines of ".jsonl" file are read as JSON values, lines
+        of other files as CSV rows. With single argument name
+        each value, other than CSV row, is the argument itself.
+
+        Yields:
+            tuple | dict: Argument values of the next case,
+            dict when they are given by names.
+        """
+        if not isinstance(self.source, str):
+            source = self.source
+            if callable(source):
+                source = source()
+            yield from map(self._normalize, source)
+            return
+
+        path = os.path.join(ROOT_DIR, self.source)
+        with open(path, newline='', encoding='utf-8') as file:
+            if not path.endswith('.jsonl'):
+                yield from map(tuple, csv.reader(file))
+                return
+
+            for line in file:
+                if line.strip():
+                    yield self._normalize(json.loads(line))
+
+    def _normalize(self, values: Any) -> Union[tuple, dict]:
+        if len(self.names) == 1 and not isinstance(values, dict):
+            return (values,)
+        return values if isinstance(values, dict) else tuple(values)
+
+
+def parametrize(names: str,
+                source: Union[Iterable, Callable[[], Iterable], str]
+                ) -> Callable:
+    """
+    Runs decorated test once for each case of the source,
+    every case is executed and reported as separate test.
+    Cases are generated lazily while tests are dispatched.
+
+    Args:
+        names (str): Comma separated names of test arguments,
+        e.g. "text, expected".
+        source (Iterable | Callable | str): Cases as iterable of
+        argument values, callable returning such iterable, e.g.
+        generator function, or path of ".jsonl" or CSV data file
+        relative to root folder.
+
+    Returns:
+        Callable: Decorator returning test method unchanged.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.parameters = Parameters(names, source)
+        return func
+
+    return decorator
+
+
 SMOKE_TEST = Template
 REGRESSION_TEST = Template
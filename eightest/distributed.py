@@ -0,0 +1,781 @@
+import os
+import time
+import shutil
+import select
+import socket
+import struct
+import secrets
+import tempfile
+import ipaddress
+
+from collections import deque
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+from multiprocess import Pipe
+from multiprocess.connection import (AuthenticationError,
+                                     Client,
+                                     Connection,
+                                     answer_challenge,
+                                     deliver_challenge,
+                                     wait)
+from eightest.logger import Address, connect, listen
+from eightest.pool import WorkerPool, stop
+from eightest.process import S_Worker
+from eightest.searcher import TestMethod
+from eightest.utilities import CACHE_DIR, load_env_file
+
+# Interval of heartbeats sent by remote workers in seconds.
+HEARTBEAT_INTERVAL = 2
+# Time without any message after which worker is considered dead.
+HEARTBEAT_TIMEOUT = 10
+# Time for which worker retries connecting to coordinator.
+CONNECT_TIMEOUT = 30
+# Random key shared by coordinator and workers of this machine
+# when AUTHKEY is not set, readable by its owner only.
+LOCAL_AUTHKEY_PATH = os.path.join(CACHE_DIR, 'authkey')
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    Args:
+        address (str): Address in "host:port" form.
+
+    Raises:
+        ValueError: When port is missing or is not a number.
+
+    Returns:
+        Tuple[str, int]: Host and port.
+    """
+    host, separator, port = address.rpartition(':')
+    if not separator:
+        raise ValueError(f'Address must be in host:port form: {address}')
+    return host or '0.0.0.0', int(port)
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Args:
+        host (str): Host name or IP address.
+
+    Returns:
+        bool: Whether host resolves to loopback address.
+    """
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def get_local_authkey() -> bytes:
+    """
+    Creates the local key on first use. Key is written
+    into temporary file which is then linked in place,
+    so that concurrent readers never see it partially.
+
+    Returns:
+        bytes: Random key stored in LOCAL_AUTHKEY_PATH.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if not os.path.exists(LOCAL_AUTHKEY_PATH):
+        fd, path = tempfile.mkstemp(dir=CACHE_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as file_obj:
+                file_obj.write(secrets.token_hex(32).encode('utf-8'))
+            os.link(path, LOCAL_AUTHKEY_PATH)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(path)
+
+    with open(LOCAL_AUTHKEY_PATH, 'rb') as file_obj:
+        return file_obj.read()
+
+
+def get_authkey(host: str) -> bytes:
+    """
+    Args:
+        host (str): Host coordinator listens on or worker connects to.
+
+    Raises:
+        ValueError: When AUTHKEY is not set and host is not loopback.
+
+    Returns:
+        bytes: Key both coordinator and workers authenticate with,
+        AUTHKEY env variable or local key on loopback address.
+    """
+    authkey = os.getenv('AUTHKEY', 'NULL')
+    if authkey not in ('', 'NULL'):
+        return authkey.encode('utf-8')
+    if not is_loopback(host):
+        raise ValueError(f'AUTHKEY must be set to use address {host}, '
+                         'only loopback address works without it.')
+    return get_local_authkey()
+
+
+class RemoteWorker(object):
+    """
+    Coordinator side of a connected worker slot.
+    Stands in for the worker process in tasks.
+    """
+    def __init__(self, conn: Connection, host: str, pid: int) -> None:
+        """
+        Args:
+            conn (Connection): Connection to the worker.
+            host (str): Host name of worker's machine.
+            pid (int): PID of worker's agent process.
+        """
+        self.host = host
+        self.pid = pid
+        self.seen = time.monotonic()
+        self._conn = conn
+        # Watchdog sends kill from its own thread, so
+        # messages to the worker are sent under lock.
+        self._lock = Lock()
+
+    def send(self, message: object) -> None:
+        """
+        Args:
+            message (object): Message for the worker's agent.
+
+        Raises:
+            OSError: When connection is broken or closed.
+        """
+        with self._lock:
+            self._conn.send(message)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def terminate(self) -> None:
+        """
+        Asks agent to kill test being executed, agent
+        reports the death once worker is gone.
+        """
+        try:
+            self.send(('kill', None))
+        except OSError:
+            pass
+
+    def is_alive(self) -> bool:
+        return not self._conn.closed
+
+
+class RemotePool(WorkerPool):
+    """
+    Pool of workers running on other machines. Coordinator
+    serves the test queue over TCP, each connection is one
+    worker slot which gets batches of tests just like local
+    worker. Workers stream back results, log records and
+    heartbeats. Slot which disconnected or stopped sending
+    heartbeats is dropped and its tasks are put back in the
+    queue, including the one being executed.
+    """
+    def __init__(self,
+                 address: Tuple[str, int],
+                 session_time: str,
+                 on_start: Callable = None,
+                 log_address: Address = None,
+                 max_runs: int = None,
+                 profile: bool = False
+                 ) -> None:
+        """
+        Args:
+            address (Tuple[str, int]): Host and port to listen on.
+            session_time (str): Test Session start time.
+            on_start (Callable, optional): Called with task
+            when worker starts executing it.
+            log_address (Address, optional): Address of session log
+            writer records of remote tests are passed to.
+            max_runs (int, optional): Maximum number of runs of a test
+            in worker, defaults to MAX_RERUNS env variable.
+            profile (bool, optional): Whether tests run under profiler,
+            profiles are written on worker's machine.
+
+        Raises:
+            ValueError: When AUTHKEY is not set and address
+            is not loopback one.
+        """
+        WorkerPool.__init__(self, 0, {}, session_time, on_start=on_start,
+                            log_address=log_address, max_runs=max_runs,
+                            profile=profile)
+        self.workers: Dict[Connection, RemoteWorker] = {}
+        self.address = address
+        self._authkey = get_authkey(address[0])
+        self._server: socket.socket = None
+        self._log_socket: socket.socket = None
+        self._joined: List[Tuple[Connection, dict]] = []
+        self._lock = Lock()
+        self._wake_reader, self._wake_writer = Pipe(duplex=False)
+
+    def start(self, batch_size: int = 1) -> None:
+        """
+        Starts listening for workers, they may join
+        and leave at any point of the session.
+
+        Args:
+            batch_size (int, optional): Maximum number
+            of tests sent to worker at once.
+        """
+        WorkerPool.start(self, batch_size)
+        self._server = socket.create_server(self.address, backlog=128)
+        self.address = self._server.getsockname()[:2]
+
+        if self._log_address is not None:
+            self._log_socket = connect(self._log_address)
+
+        print('Waiting for workers on {}:{}.'.format(*self.address))
+
+    def _handshake(self, sock: socket.socket) -> None:
+        """
+        Authenticates new connection and sends session
+        details to the worker. Runs in its own thread,
+        so that slow client does not hold the session.
+
+        Args:
+            sock (socket.socket): Accepted connection.
+        """
+        conn = Connection(sock.detach())
+        try:
+            deliver_challenge(conn, self._authkey)
+            answer_challenge(conn, self._authkey)
+            if not conn.poll(HEARTBEAT_TIMEOUT):
+                raise EOFError
+            kind, info = conn.recv()
+            if kind != 'hello':
+                raise EOFError
+            conn.send(('session', {
+                "session_time": self._session_time,
+                "max_runs": self._max_runs or int(os.getenv('MAX_RERUNS')),
+                "profile": self._profile
+            }))
+            with self._lock:
+                self._joined.append((conn, info))
+            self._wake_writer.send(None)
+
+        except (AuthenticationError, EOFError, OSError):
+            conn.close()
+
+    def _admit(self) -> None:
+        """
+        Adds workers which have completed handshake.
+        """
+        while self._wake_reader.poll():
+            self._wake_reader.recv()
+
+        with self._lock:
+            joined, self._joined = self._joined, []
+
+        for conn, info in joined:
+            self.workers[conn] = RemoteWorker(conn, info['host'], info['pid'])
+
+    def idle(self) -> Optional[Connection]:
+        """
+        Returns:
+            Connection | None: Connection of any idle worker.
+        """
+        for conn in self.workers:
+            if conn not in self.busy:
+                return conn
+        return None
+
+    def submit(self, conn: Connection, tasks: List) -> None:
+        """
+        Sends batch of tests to the given idle worker by their
+        IDs and keys, worker's machine imports them by keys.
+        Case of parametrized test is sent along with its
+        test method, which holds its arguments.
+
+        Args:
+            conn (Connection): Worker connection.
+            tasks (List[Task]): Tasks to be executed in order.
+        """
+        items = []
+        for task in tasks:
+            task.assign(self.workers[conn], conn)
+            test_method = task.test_method
+            case = test_method if test_method.case is not None else None
+            items.append((test_method.value, test_method.key,
+                          task.runs + 1, case))
+        self.busy[conn] = deque(tasks)
+
+        try:
+            self.workers[conn].send(('run', items))
+        except OSError:
+            self._drop(conn)
+            return
+
+        self._progress[conn] = time.perf_counter()
+        self._begin(tasks[0])
+
+    def wait(self, timeout: Optional[float] = None) -> List[Connection]:
+        """
+        Waits until any worker sends a message, new worker
+        connects or heartbeat of some worker expires.
+
+        Args:
+            timeout (float | None): Maximum waiting time in seconds.
+
+        Returns:
+            List[Connection]: Connections of workers ready to be collected.
+        """
+        now = time.monotonic()
+        if self.workers:
+            deadline = min(worker.seen for worker in self.workers.values())
+            expiry = max(deadline + HEARTBEAT_TIMEOUT - now, 0)
+            timeout = expiry if timeout is None else min(timeout, expiry)
+
+        ready_list = wait([*self.workers, self._server, self._wake_reader],
+                          timeout)
+
+        if self._server in ready_list:
+            sock, _ = self._server.accept()
+            Thread(target=self._handshake, args=(sock,), daemon=True).start()
+        if self._wake_reader in ready_list:
+            self._admit()
+
+        now = time.monotonic()
+        expired = [conn for conn, worker in self.workers.items()
+                   if now - worker.seen > HEARTBEAT_TIMEOUT]
+        return list(dict.fromkeys([*(ready for ready in ready_list
+                                     if ready in self.workers), *expired]))
+
+    def collect(self,
+                ready_list: List[Connection]
+                ) -> List[Tuple[object, Optional[tuple]]]:
+        """
+        Receives messages from ready workers. When worker's
+        process has died during test, rest of its batch is
+        moved to orphaned list. Whole batch is orphaned
+        when the worker itself is gone.
+
+        Args:
+            ready_list (List[Connection]): Result of wait method.
+
+        Returns:
+            List[Tuple[Task, tuple | None]]: Finished tasks along with
+            their results, None when worker died during test.
+        """
+        finished = []
+
+        for conn in ready_list:
+            if (worker := self.workers.get(conn)) is None:
+                continue
+
+            try:
+                while conn.poll():
+                    kind, data = conn.recv()
+                    worker.seen = time.monotonic()
+
+                    if kind == 'results':
+                        finished.extend(self._unpack(conn, data))
+                    elif kind == 'log':
+                        self._write_log(data)
+                    elif kind == 'died':
+                        finished.extend(self._died(conn))
+                        # Fixtures died along with worker process.
+                        self._releases.pop(conn, None)
+
+            except (EOFError, OSError):
+                self._drop(conn)
+                continue
+
+            if time.monotonic() - worker.seen > HEARTBEAT_TIMEOUT:
+                self._drop(conn)
+
+        return finished
+
+    def _write_log(self, data: bytes) -> None:
+        """
+        Passes log records of remote tests to session log writer.
+
+        Args:
+            data (bytes): Complete length-prefixed records.
+        """
+        if self._log_socket is not None:
+            self._log_socket.sendall(data)
+
+    def _send_release(self, conn: Connection, scopes: List[str]) -> None:
+        """
+        Args:
+            conn (Connection): Connection of idle worker.
+            scopes (List[str]): Keys of exhausted scopes.
+        """
+        try:
+            self.workers[conn].send(('release', scopes))
+        except OSError:
+            pass
+
+    def renew(self, conn: Connection) -> Connection:
+        """
+        Asks worker to replace its idle process with a new
+        one, so that next test runs in a fresh process.
+
+        Args:
+            conn (Connection): Connection of idle worker.
+
+        Returns:
+            Connection: The same connection.
+        """
+        try:
+            self.workers[conn].send(('renew', None))
+        except OSError:
+            pass
+        return conn
+
+    def _drop(self, conn: Connection) -> None:
+        """
+        Forgets worker which is gone and orphans its batch.
+
+        Args:
+            conn (Connection): Connection of lost worker.
+        """
+        self.orphaned.extend(self.busy.pop(conn, ()))
+        self.workers.pop(conn).close()
+        self._progress.pop(conn, None)
+        self._releases.pop(conn, None)
+        self._killed.pop(conn, None)
+
+    def close(self) -> None:
+        """
+        Lets all workers know the session is over
+        and stops listening for new ones.
+        """
+        for worker in self.workers.values():
+            try:
+                worker.send(None)
+            except OSError:
+                pass
+            worker.close()
+
+        self.workers.clear()
+        self.busy.clear()
+        if self._server is not None:
+            self._server.close()
+        if self._log_socket is not None:
+            self._log_socket.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+
+
+class TestKeys(dict):
+    """
+    Test methods by their keys, created on first use,
+    so that worker does not need to discover tests.
+    """
+    def __missing__(self, key: str) -> TestMethod:
+        module_path, test_class, test_name = key.rsplit('.', 2)
+        test_method = self[key] = TestMethod(module_path, test_class,
+                                             test_name, key)
+        return test_method
+
+
+class RemoteSlot(object):
+    """
+    Single connection of agent to the coordinator along
+    with local worker process executing its tests. Worker
+    sends its log records to slot's Unix socket, they are
+    relayed to coordinator before results of the test.
+    """
+    def __init__(self, conn: Connection, session: dict) -> None:
+        """
+        Args:
+            conn (Connection): Authenticated coordinator connection.
+            session (dict): Session details sent by coordinator.
+        """
+        self.conn = conn
+        self.session = session
+        self.busy = 0
+        self.worker: S_Worker = None
+        self.worker_conn: Connection = None
+        self._tests = TestKeys()
+        self._values: Dict[str, str] = {}
+        self._folder = tempfile.mkdtemp(prefix='eightest-')
+        self.log_server = listen(os.path.join(self._folder, 'log.sock'), 8)
+        self.log_address = self.log_server.getsockname()
+        self.log_clients: Dict[socket.socket, bytearray] = {}
+        self.spawn()
+
+    def spawn(self) -> None:
+        """
+        Starts new local worker process.
+        """
+        parent_conn, child_conn = Pipe()
+        self.worker = S_Worker(tests=self._tests,
+                               session_time=self.session['session_time'],
+                               pipe_conn=child_conn,
+                               log_address=self.log_address,
+                               max_runs=self.session['max_runs'],
+                               profile=self.session['profile'])
+        self.worker.start()
+        child_conn.close()
+        self.worker_conn = parent_conn
+
+    def handlers(self) -> Dict[object, Callable]:
+        """
+        Returns:
+            Dict[object, Callable]: Handlers of objects to wait for.
+        """
+        handlers = {
+            self.conn: self.command,
+            self.worker_conn: self.results,
+            self.worker.sentinel: self.died,
+            self.log_server: self.accept_log
+        }
+        for client in self.log_clients:
+            handlers[client] = lambda client=client: self.read_log(client)
+        return handlers
+
+    def command(self) -> None:
+        """
+        Handles message from coordinator.
+
+        Raises:
+            EOFError: When session is over or coordinator is gone.
+        """
+        if (message := self.conn.recv()) is None:
+            raise EOFError
+
+        kind, data = message
+        if kind == 'run':
+            items = []
+            for value, key, first_run, case in data:
+                self._values[key] = value
+                if case is None:
+                    items.append((key, first_run))
+                else:
+                    items.append((key, first_run, case))
+            self.busy += len(items)
+            self.worker_conn.send(items)
+
+        elif kind == 'release':
+            self.worker_conn.send(set(data))
+
+        elif kind == 'kill' and self.busy:
+            self.worker.terminate()
+
+        elif kind == 'renew' and not self.busy:
+            self.worker_conn.send(None)
+            stop(self.worker, 1)
+            self.worker_conn.close()
+            self.spawn()
+
+    def results(self) -> bool:
+        """
+        Relays results of local worker, with IDs
+        coordinator has sent, after their log records.
+
+        Returns:
+            bool: False when worker's pipe is closed.
+        """
+        try:
+            responses = self.worker_conn.recv()
+        except (EOFError, OSError):
+            return False
+
+        self.drain_logs()
+        self.busy -= len(responses)
+        self.conn.send(('results', [(self._values.pop(key), *result)
+                                    for key, *result in responses]))
+        return True
+
+    def died(self) -> None:
+        """
+        Reports death of local worker during test
+        and replaces it with a new one.
+        """
+        while self.worker_conn.poll() and self.results():
+            pass
+
+        self.worker.join()
+        self.worker_conn.close()
+        self.drain_logs()
+        if self.busy:
+            self.busy = 0
+            self._values.clear()
+            self.conn.send(('died', None))
+        self.spawn()
+
+    def accept_log(self) -> None:
+        client, _ = self.log_server.accept()
+        # Records may be drained before client is handled.
+        client.setblocking(False)
+        self.log_clients[client] = bytearray()
+
+    def read_log(self, client: socket.socket) -> None:
+        """
+        Sends all complete records received from
+        local worker to coordinator.
+
+        Args:
+            client (socket.socket): Worker's log connection.
+        """
+        try:
+            data = client.recv(65536)
+        except BlockingIOError:
+            return
+
+        if not data:
+            client.close()
+            del self.log_clients[client]
+            return
+
+        buffer = self.log_clients[client]
+        buffer += data
+        end = 0
+        while len(buffer) - end >= 4:
+            size = struct.unpack('>L', buffer[end:end + 4])[0]
+            if len(buffer) - end < size + 4:
+                break
+            end += size + 4
+
+        if end:
+            self.conn.send(('log', bytes(buffer[:end])))
+            del buffer[:end]
+
+    def drain_logs(self) -> None:
+        """
+        Relays log records which are already received.
+        """
+        while self.log_clients:
+            ready_list, _, _ = select.select(list(self.log_clients),
+                                             [], [], 0)
+            if not ready_list:
+                break
+            for client in ready_list:
+                self.read_log(client)
+
+    def heartbeat(self) -> None:
+        self.conn.send(('heartbeat', None))
+
+    def close(self) -> None:
+        """
+        Stops local worker, terminates it if still busy.
+        """
+        if self.busy:
+            self.worker.terminate()
+        else:
+            try:
+                self.worker_conn.send(None)
+            except OSError:
+                self.worker.terminate()
+
+        stop(self.worker)
+        self.worker_conn.close()
+        self.conn.close()
+        for client in self.log_clients:
+            client.close()
+        self.log_server.close()
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+
+class WorkerAgent(object):
+    """
+    Runs tests of a remote session on this machine. Opens
+    one connection to coordinator per slot, serves all of
+    them in a single loop and sends heartbeats, so that
+    coordinator notices when the machine is gone. Exits
+    when coordinator ends the session.
+    """
+    def __init__(self, address: Tuple[str, int], slots: int = 1) -> None:
+        """
+        Args:
+            address (Tuple[str, int]): Host and port of coordinator.
+            slots (int, optional): Number of tests run at the same time.
+        """
+        self.address = address
+        self.slots: List[RemoteSlot] = []
+        self._count = slots
+
+    def connect(self) -> Connection:
+        """
+        Raises:
+            ConnectionRefusedError: When coordinator has not
+            started listening within CONNECT_TIMEOUT.
+            ValueError: When AUTHKEY is not set and coordinator
+            is not on loopback address.
+
+        Returns:
+            Connection: Authenticated coordinator connection.
+        """
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            try:
+                return Client(self.address,
+                              authkey=get_authkey(self.address[0]))
+            except ConnectionRefusedError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(1)
+
+    def run(self) -> None:
+        """
+        Joins the session with all slots and executes
+        tests until coordinator closes the connections.
+        """
+        for _ in range(self._count):
+            conn = self.connect()
+            conn.send(('hello', {"host": socket.gethostname(),
+                                 "pid": os.getpid()}))
+            kind, session = conn.recv()
+            self.slots.append(RemoteSlot(conn, session))
+
+        beat = time.monotonic()
+        try:
+            while self.slots:
+                timeout = max(beat + HEARTBEAT_INTERVAL - time.monotonic(), 0)
+                waiting = {}
+                for slot in self.slots:
+                    waiting.update(dict.fromkeys(slot.handlers(), slot))
+
+                for ready in wait(list(waiting), timeout):
+                    slot = waiting[ready]
+                    # Earlier handler may have replaced the object.
+                    if (handler := slot.handlers().get(ready)) is None:
+                        continue
+                    try:
+                        handler()
+                    except (EOFError, OSError):
+                        self.stop(slot)
+
+                if time.monotonic() - beat >= HEARTBEAT_INTERVAL:
+                    beat = time.monotonic()
+                    for slot in self.slots[:]:
+                        try:
+                            slot.heartbeat()
+                        except OSError:
+                            self.stop(slot)
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            for slot in self.slots[:]:
+                self.stop(slot)
+
+    def stop(self, slot: RemoteSlot) -> None:
+        """
+        Args:
+            slot (RemoteSlot): Slot whose connection is over.
+        """
+        if slot in self.slots:
+            self.slots.remove(slot)
+            slot.close()
+
+
+def argsparser(args: List[str] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='eightest worker')
+    parser.add_argument('--connect', metavar='HOST:PORT', required=True,
+                        help='address of coordinator running the session')
+    parser.add_argument('-n', metavar='SLOTS', type=int, default=1,
+                        help='number of tests run at the same time')
+    args = parser.parse_args(args)
+
+    load_env_file()
+    WorkerAgent(parse_address(args.connect), args.n).run()
+
+
+if __name__ == "__main__":
+    argsparser()
@@ -0,0 +1,205 @@
+import json
+import asyncio
+
+from collections import deque
+from threading import Condition
+from typing import Callable, Deque, Iterator, List, Tuple
+
+
+# Interval of keep-alive comments sent to idle clients in seconds.
+HEARTBEAT = 15
+
+
+class EventStream(object):
+    """
+    Bounded log of test session events shared by all clients.
+    Each event has increasing sequence number (id), clients
+    read events after the last id they have seen, so slow
+    client only gets bigger portions instead of growing
+    queue. Client which fell behind the retained events
+    is informed that it has lost some of them.
+    """
+    def __init__(self, size: int = 10000) -> None:
+        """
+        Args:
+            size (int, optional): Number of retained events.
+        """
+        self._events: Deque[dict] = deque(maxlen=size)
+        self._sequence = 0
+        self._condition = Condition()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop,
+                                  asyncio.Future]] = []
+
+    @property
+    def sequence(self) -> int:
+        """
+        Returns:
+            int: Id of the last published event.
+        """
+        return self._sequence
+
+    def publish(self, type: str, data: dict) -> None:
+        """
+        Appends event and wakes up waiting clients.
+
+        Args:
+            type (str): Event type.
+            data (dict): JSON serializable event data.
+        """
+        with self._condition:
+            self._sequence += 1
+            self._events.append({"id": self._sequence,
+                                 "type": type,
+                                 "data": data})
+            self._condition.notify_all()
+            waiters, self._waiters = self._waiters, []
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def read(self,
+             since: int,
+             timeout: float = None
+             ) -> Tuple[List[dict], bool]:
+        """
+        Returns events published after given id, waits
+        for new ones up to timeout if there are none.
+
+        Args:
+            since (int): Id of the last event client has seen.
+            timeout (float, optional): Maximum waiting time in seconds.
+
+        Returns:
+            Tuple[List[dict], bool]: Events and whether some
+            events after since are no longer retained.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence > since, timeout)
+            return self._after(since)
+
+    async def aread(self,
+                    since: int,
+                    timeout: float = None
+                    ) -> Tuple[List[dict], bool]:
+        """
+        Asynchronous version of read method,
+        does not block the event loop while waiting.
+
+        Args:
+            since (int): Id of the last event client has seen.
+            timeout (float, optional): Maximum waiting time in seconds.
+
+        Returns:
+            Tuple[List[dict], bool]: Events and whether some
+            events after since are no longer retained.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._condition:
+            if self._sequence > since:
+                return self._after(since)
+            self._waiters.append((loop, future))
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+        with self._condition:
+            return self._after(since)
+
+    def _after(self, since: int) -> Tuple[List[dict], bool]:
+        """
+        Must be called with condition acquired.
+
+        Args:
+            since (int): Id of the last event client has seen.
+
+        Returns:
+            Tuple[List[dict], bool]: Events after since
+            and whether some of them were dropped.
+        """
+        if not self._events or since >= self._sequence:
+            return [], False
+
+        first = self._events[0]["id"]
+        lost = since + 1 < first
+        start = max(since + 1 - first, 0)
+        return list(self._events)[start:], lost
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def format_event(event: dict) -> str:
+    """
+    Args:
+        event (dict): Event from the stream.
+
+    Returns:
+        str: Event in Server-Sent Events format.
+    """
+    return (f'id: {event["id"]}\n'
+            f'event: {event["type"]}\n'
+            f'data: {json.dumps(event["data"])}\n\n')
+
+
+def render_events(events: List[dict],
+                  lost: bool,
+                  snapshot: Callable[[], dict],
+                  sequence: int
+                  ) -> Tuple[str, int]:
+    """
+    Formats portion of events for client. Client which
+    has lost events gets snapshot of the session first.
+
+    Args:
+        events (List[dict]): Events read from the stream.
+        lost (bool): Whether client has lost some events.
+        snapshot (Callable[[], dict]): Returns full session progress.
+        sequence (int): Id of the last event client has seen.
+
+    Returns:
+        Tuple[str, int]: Message to be sent and id
+        of the last event it contains.
+    """
+    if not events:
+        return ': keepalive\n\n', sequence
+
+    message = ''
+    if lost:
+        message += format_event({"id": events[0]["id"] - 1,
+                                 "type": "snapshot",
+                                 "data": snapshot()})
+
+    message += ''.join(format_event(event) for event in events)
+    return message, events[-1]["id"]
+
+
+def stream(events: EventStream,
+           snapshot: Callable[[], dict],
+           since: int = 0
+           ) -> Iterator[str]:
+    """
+    Endless generator of Server-Sent Events messages,
+    meant for streaming response of a threaded server.
+
+    Args:
+        events (EventStream): Stream of session events.
+        snapshot (Callable[[], dict]): Returns full session progress.
+        since (int, optional): Id of the last event client has seen.
+
+    Yields:
+        str: Messages with events or keep-alive comments.
+    """
+    while True:
+        portion, lost = events.read(since, HEARTBEAT)
+        message, since = render_events(portion, lost, snapshot, since)
+        yield message
@@ -0,0 +1,151 @@
+import sys
+import importlib
+
+from traceback import format_exc
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from eightest.searcher import TestMethod
+
+# Key of session scope, class and module scopes
+# are keyed by class and module names.
+SESSION = ''
+
+
+def scope_keys(test_method: TestMethod) -> Tuple[str, str]:
+    """
+    Args:
+        test_method (TestMethod): Particular test.
+
+    Returns:
+        Tuple[str, str]: Keys of test's class and module scopes.
+    """
+    return (f'{test_method.module_path}.{test_method.test_class}',
+            test_method.module_path)
+
+
+class ScopeCounter(object):
+    """
+    Counts tests of each class and module not taken for
+    execution yet. Scopes whose tests have all been taken
+    are collected, so that workers can be told to tear
+    down their fixtures.
+    """
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._exhausted: List[str] = []
+
+    def add(self, tests: Iterable[TestMethod]) -> None:
+        """
+        Args:
+            tests (Iterable[TestMethod]): Tests to be executed.
+        """
+        for test_method in tests:
+            for key in scope_keys(test_method):
+                self._counts[key] = self._counts.get(key, 0) + 1
+
+    def take(self, test_method: TestMethod) -> None:
+        """
+        Args:
+            test_method (TestMethod): Test taken for execution.
+        """
+        for key in scope_keys(test_method):
+            if (count := self._counts.get(key)) is None:
+                continue
+            if count > 1:
+                self._counts[key] = count - 1
+            else:
+                del self._counts[key]
+                self._exhausted.append(key)
+
+    def exhausted(self) -> List[str]:
+        """
+        Returns:
+            List[str]: Keys of scopes exhausted since the last call.
+        """
+        exhausted, self._exhausted = self._exhausted, []
+        return exhausted
+
+
+class Fixtures(object):
+    """
+    Scoped setup hooks of tests executed in the current
+    process. Class scope is set up by before_class of test
+    class, module scope by before_module function of test
+    module and session scope by before_session function of
+    top test package. Each scope is set up before its first
+    test and kept until it is released or the process ends,
+    then its after_* hook is called. Session scope spans
+    tests of a single worker process.
+    """
+    def __init__(self) -> None:
+        # Teardown hooks of scopes set up, in order of setup.
+        self._active: Dict[str, Optional[Callable]] = {}
+
+    def run(self, test_class: type, target: Callable) -> None:
+        """
+        Sets up scopes of the test which are not set up
+        yet and runs it. Scope whose setup fails is set
+        up again with the next test.
+
+        Args:
+            test_class (type): Class of the test.
+            target (Callable): Test callable without arguments.
+        """
+        module = sys.modules[test_class.__module__]
+        if '.' in module.__name__:
+            package = module.__name__.split('.', 1)[0]
+            self._enter(SESSION, importlib.import_module(package),
+                        'before_session', 'after_session')
+        self._enter(module.__name__, module, 'before_module', 'after_module')
+        self._enter(f'{module.__name__}.{test_class.__name__}', test_class,
+                    'before_class', 'after_class')
+        target()
+
+    def _enter(self,
+               key: str,
+               owner: object,
+               setup: str,
+               teardown: str
+               ) -> None:
+        """
+        Args:
+            key (str): Scope key.
+            owner (object): Package, module or class defining hooks.
+            setup (str): Name of setup hook.
+            teardown (str): Name of teardown hook.
+        """
+        if key in self._active:
+            return
+        if (hook := getattr(owner, setup, None)) is not None:
+            hook()
+        self._active[key] = getattr(owner, teardown, None)
+
+    def release(self, keys: Iterable[str]) -> None:
+        """
+        Tears down given scopes which are set up,
+        in reverse order of their setup.
+
+        Args:
+            keys (Iterable[str]): Keys of scopes with no tests left.
+        """
+        keys = set(keys)
+        for key in reversed([key for key in self._active if key in keys]):
+            self._exit(key)
+
+    def close(self) -> None:
+        """
+        Tears down all scopes, in reverse order of their setup.
+        """
+        for key in reversed(list(self._active)):
+            self._exit(key)
+
+    def _exit(self, key: str) -> None:
+        """
+        Args:
+            key (str): Key of scope set up.
+        """
+        if (hook := self._active.pop(key)) is None:
+            return
+        try:
+            hook()
+        except Exception:
+            print(format_exc())
@@ -1,41 +1,69 @@
 from typing import Any, Dict
 from django.shortcuts import render
 from utilities import ROOT_DIR
+from logreader import PAGE_LINES, LogReader, resolve_log
+from database import ResultStore
 import os
 from django.views.generic import TemplateView
 from django.http.response import JsonResponse
 
+store = ResultStore()
+
 
 class HistoryView(TemplateView):
     template_name = "history.html"
     logs_path = os.path.join(ROOT_DIR, 'logs')
-    logs_list = os.listdir(logs_path)
-    final_list = []
+    sessions_limit = 50
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
-        HistoryView.final_list.clear()
-        for item in HistoryView.logs_list:
-            log_files = os.listdir(os.path.join(ROOT_DIR, 'logs', item))
-            HistoryView.final_list.append({item: log_files})
+        sessions = store.last_sessions(HistoryView.sessions_limit)
+        session_logs = store.session_logs(item['id'] for item in sessions)
+        final_list = [{item['log_folder']: session_logs[item['id']]}
+                      for item in sessions]
+
+        # Sessions run before the store existed are listed from disk.
+        known = store.log_folders()
+        for item in sorted(os.listdir(HistoryView.logs_path), reverse=True):
+            log_folder = os.path.join(HistoryView.logs_path, item)
+            if item not in known and os.path.isdir(log_folder):
+                final_list.append({item: sorted(os.listdir(log_folder))})
 
         context = super(HistoryView, self).get_context_data(**kwargs)
-        log_file = os.path.join(HistoryView.logs_path, 'test_session_2022-10-16__14-47-26', 'test_center2.log')
-        file = open(log_file, 'r')
-        lines = file.readlines()
-        context['loglines'] = lines
-        context['logs'] = HistoryView.final_list
+        context['loglines'] = []
+        context['logs'] = final_list
         return context
 
     def history(self, request):
         return render(request, 'history.html', self.get_context_data())
 
     def answer_me_hist(request):
+        """
+        Returns window of log file lines. Parameter offset
+        gives lines after it (live follow), before gives
+        lines preceding it (paging back), none of them
+        gives tail of the file. Lines limits window size.
+        """
         if request.method == 'GET':
-            log_folder = request.GET.get('log_folder')
-            log_file = request.GET.get('log_file')
-            log_path = os.path.join(HistoryView.logs_path, log_folder, log_file)
-            file = open(log_path, 'r')
-            lines = file.readlines()
-            return JsonResponse({"loglines": lines})
+            log_folder = request.GET.get('log_folder', '')
+            log_file = request.GET.get('log_file', '')
+            try:
+                count = int(request.GET.get('lines', PAGE_LINES))
+                log_path = resolve_log(HistoryView.logs_path,
+                                       log_folder, log_file)
+                reader = LogReader(log_path)
+
+                if (offset := request.GET.get('offset')) is not None:
+                    window = reader.since(int(offset), count)
+                elif (before := request.GET.get('before')) is not None:
+                    window = reader.before(int(before), count)
+                else:
+                    window = reader.tail(count)
+
+            except ValueError:
+                return JsonResponse({"error": 'Wrong offset.'}, status=400)
+            except OSError:
+                return JsonResponse({"error": 'Log not found.'}, status=404)
+
+            return JsonResponse(window.serialize())
         else:
             return JsonResponse({"name": 'xd5'})
@@ -19,4 +19,6 @@ def checkboxes(request):
     lista = request.POST.getlist('checks[]')
     request.session['my_data'] = lista
     # return render(request, 'home.html')
-    return function(request, {"xd": lista})
+    return function(request, {"xd": lista,
+                              "failed": request.POST.get('failed'),
+                              "profile": request.POST.get('profile') == 'on'})
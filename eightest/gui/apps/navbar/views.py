@@ -3,9 +3,10 @@ import logging
 import threading
 
 from runner import Runner
+from events import stream
 from utilities import ROOT_DIR
 from django.shortcuts import render
-from django.http.response import JsonResponse
+from django.http.response import JsonResponse, StreamingHttpResponse
 
 log = logging.getLogger('main')
 
@@ -23,6 +24,8 @@ def function(request, context):
     #     print(type(dat))
     data = context["xd"]
 
+    runner.failed = context.get("failed") or None
+    runner.profile = context.get("profile", False)
     runner.collect_tests(data)
     runner.dispatch_tasks()
 
@@ -40,12 +43,43 @@ def answer_me(request):
     if request.method == 'GET':
         global variable
         if variable:
-            response = runner.tasks.get_progress()
+            since = parse_cursor(request.GET.get('since'))
+            response = runner.tasks.get_progress(since)
             return JsonResponse({"name": response, "variable": variable})
         else:
             return JsonResponse({"name": 'xd'})
 
 
+def parse_cursor(value: str) -> int:
+    """
+    Malformed cursor sent by client means from the start.
+    """
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_cursor(headers: dict, query: dict) -> int:
+    """
+    Reconnecting EventSource sends id of the last
+    received event in Last-Event-ID header, first
+    connection may pass it as since parameter.
+    """
+    return parse_cursor(headers.get('Last-Event-ID') or query.get('since'))
+
+
+def events(request):
+    if request.method == 'GET':
+        since = get_cursor(request.headers, request.GET)
+        response = StreamingHttpResponse(
+            stream(runner.tasks.events, runner.tasks.get_progress, since),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 def playpause(request):
     if request.method == 'GET':
         global variable
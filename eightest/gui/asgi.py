@@ -2,15 +2,80 @@
 ASGI config for gui project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Live results stream is served here directly, so that waiting
+clients do not occupy threads of the Django application.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
 
 import os
+import asyncio
 
+from urllib.parse import parse_qsl
 from django.core.asgi import get_asgi_application
+from django.utils.datastructures import CaseInsensitiveMapping
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gui.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Views need configured Django, import them only after setup.
+from events import HEARTBEAT, render_events  # noqa: E402
+from gui.apps.navbar import views as navbar_views  # noqa: E402
+
+
+async def wait_disconnect(receive) -> None:
+    """
+    Returns when client closes the connection.
+    """
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def events_application(scope, receive, send) -> None:
+    """
+    Streams test session events as Server-Sent Events.
+    Every message contains all events client has not
+    received yet, so slow client does not pile them up.
+    """
+    headers = CaseInsensitiveMapping({
+        key.decode('latin-1'): value.decode('latin-1')
+        for key, value in scope['headers']
+    })
+    query = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+    since = navbar_views.get_cursor(headers, query)
+    tasks = navbar_views.runner.tasks
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no')]
+    })
+
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        while True:
+            read = asyncio.ensure_future(tasks.events.aread(since, HEARTBEAT))
+            await asyncio.wait({read, disconnect},
+                               return_when=asyncio.FIRST_COMPLETED)
+            if disconnect.done():
+                read.cancel()
+                return
+
+            portion, lost = read.result()
+            message, since = render_events(portion, lost,
+                                           tasks.get_progress, since)
+            await send({'type': 'http.response.body',
+                        'body': message.encode('utf-8'),
+                        'more_body': True})
+    finally:
+        disconnect.cancel()
+
+
+async def application(scope, receive, send) -> None:
+    if scope['type'] == 'http' and scope['path'] == '/events':
+        return await events_application(scope, receive, send)
+    return await django_application(scope, receive, send)
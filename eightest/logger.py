@@ -1,15 +1,65 @@
 import os
+import sys
 import time
+import pickle
+import shutil
+import signal
+import socket
+import struct
 import logging
+import tempfile
 
 from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, IO, List, Optional, Tuple, Union
+from logging.handlers import SocketHandler
 from logging import (FileHandler,
                      StreamHandler,
                      Formatter,
                      Logger)
 
+from multiprocess import Pipe, Process
+from multiprocess.connection import wait
 from eightest.testcase import Status
 
+# Unix socket path or host and port of loopback TCP socket.
+Address = Union[str, Tuple[str, int]]
+# Loopback TCP is used where Unix sockets are not available.
+UNIX_SOCKETS = hasattr(socket, 'AF_UNIX')
+
+
+def listen(path: str, backlog: int = 128) -> socket.socket:
+    """
+    Args:
+        path (str): Unix socket path, used where available.
+        backlog (int, optional): Number of pending connections.
+
+    Returns:
+        socket.socket: Listening Unix socket, loopback TCP
+        socket on a free port where Unix sockets are missing.
+    """
+    if UNIX_SOCKETS:
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(backlog)
+        return server
+    return socket.create_server(('127.0.0.1', 0), backlog=backlog)
+
+
+def connect(address: Address) -> socket.socket:
+    """
+    Args:
+        address (Address): Address of listening socket.
+
+    Returns:
+        socket.socket: Connected socket.
+    """
+    if isinstance(address, str):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(address)
+        return client
+    return socket.create_connection(tuple(address))
+
 
 date_format = '%Y-%m-%d %H:%M:%S'
 text_format = '%(asctime)s %(levelname)-8s ' \
@@ -79,6 +129,197 @@ class S_StreamHandler(StreamHandler):
         self.setFormatter(formatter)
 
 
+class S_SocketHandler(SocketHandler):
+    """
+    Class that overrides standard Logging SocketHandler.
+    Sends records to session log writer, one handler
+    is shared by all tests executed in a process.
+    """
+    # Handler of the current process and its pid.
+    __instance: Optional[tuple] = None
+
+    def __init__(self, address: Address) -> None:
+        """
+        Args:
+            address (Address): Address of the log writer.
+        """
+        if isinstance(address, str):
+            SocketHandler.__init__(self, address, None)
+        else:
+            SocketHandler.__init__(self, *address)
+        self.test_name: str = None
+
+    def makePickle(self, record: logging.LogRecord) -> bytes:
+        """
+        Marks record with name of the test it belongs to.
+        """
+        record.test_name = self.test_name
+        return SocketHandler.makePickle(self, record)
+
+    @classmethod
+    def get(cls, address: Address) -> 'S_SocketHandler':
+        """
+        Returns handler of the current process, so that
+        worker running many tests keeps one connection.
+
+        Args:
+            address (Address): Address of the log writer.
+
+        Returns:
+            S_SocketHandler: Handler connected to the writer.
+        """
+        pid = os.getpid()
+        if (cls.__instance is None or cls.__instance[0] != pid
+           or cls.__instance[1].address != address):
+            cls.__instance = (pid, cls(address))
+        return cls.__instance[1]
+
+
+class LogWriter(Process):
+    """
+    Single process writing logs of the whole test session.
+    Test processes send records to its socket, writer
+    keeps buffered per-test log files and prints records
+    to console, flushing both every FLUSH_INTERVAL.
+    """
+    # Interval of flushing files and console in seconds.
+    FLUSH_INTERVAL = 0.5
+    # Maximum number of log files kept open.
+    MAX_OPEN = 64
+
+    def __init__(self, session_date: str, console: bool = True) -> None:
+        """
+        Args:
+            session_date (str): Start date of whole test session.
+            console (bool, optional): Whether records are printed.
+        """
+        Process.__init__(self, name='LogWriter', daemon=True)
+        self._folder = tempfile.mkdtemp(prefix='eightest-')
+        # Known once the writer listens, TCP port is chosen then.
+        self.address: Address = os.path.join(self._folder, 'log.sock')
+        self.folder_path = os.path.join('logs', f'test_session_{session_date}')
+        self.console = console
+        self._ready_reader, self._ready_writer = Pipe(duplex=False)
+        self._stop_reader, self._stop_writer = Pipe(duplex=False)
+        self._files: Dict[str, IO] = OrderedDict()
+        self._output: List[str] = []
+        self._formatter = Formatter(text_format, date_format)
+
+    def start(self) -> None:
+        """
+        Starts writer and waits until it accepts connections.
+        """
+        Process.start(self)
+        self.address = self._ready_reader.recv()
+
+    def stop(self) -> None:
+        """
+        Lets writer drain records of finished tests and waits
+        for it. Must be called after all test processes ended.
+        """
+        self._stop_writer.send(None)
+        self.join()
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def run(self) -> None:
+        """
+        Receives records until stopped. After stop request
+        it reads whatever is left and exits when idle.
+        """
+        # Runner stops the writer itself after CTRL-C.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        server = listen(self.address)
+        os.makedirs(self.folder_path, exist_ok=True)
+        self._ready_writer.send(server.getsockname())
+
+        clients: Dict[socket.socket, bytearray] = {}
+        stopping = False
+        flushed = time.perf_counter()
+
+        while True:
+            readers = [server, *clients]
+            if not stopping:
+                readers.append(self._stop_reader)
+
+            timeout = 0 if stopping else LogWriter.FLUSH_INTERVAL
+            # Unlike select, wait also takes the stop pipe on Windows.
+            ready_list = wait(readers, timeout)
+            if stopping and not ready_list:
+                break
+
+            for ready in ready_list:
+                if ready is server:
+                    client, _ = server.accept()
+                    clients[client] = bytearray()
+                elif ready is self._stop_reader:
+                    self._stop_reader.recv()
+                    stopping = True
+                elif data := ready.recv(65536):
+                    self.receive(clients[ready], data)
+                else:
+                    ready.close()
+                    del clients[ready]
+
+            if time.perf_counter() - flushed >= LogWriter.FLUSH_INTERVAL:
+                self.flush()
+                flushed = time.perf_counter()
+
+        self.flush()
+        for file in self._files.values():
+            file.close()
+        server.close()
+
+    def receive(self, buffer: bytearray, data: bytes) -> None:
+        """
+        Writes all complete records received from a client.
+
+        Args:
+            buffer (bytearray): Not yet processed data of the client.
+            data (bytes): Newly received data.
+        """
+        buffer += data
+        while len(buffer) >= 4:
+            size = struct.unpack('>L', buffer[:4])[0]
+            if len(buffer) < size + 4:
+                break
+            record = logging.makeLogRecord(pickle.loads(buffer[4:size + 4]))
+            del buffer[:size + 4]
+            self.write(record)
+
+    def write(self, record: logging.LogRecord) -> None:
+        """
+        Args:
+            record (logging.LogRecord): Record sent by test process.
+        """
+        line = self._formatter.format(record) + '\n'
+        test_name = getattr(record, 'test_name', None) or 'session'
+
+        if (file := self._files.get(test_name)) is None:
+            file_path = os.path.join(self.folder_path, f'{test_name}.log')
+            file = self._files[test_name] = open(file_path, 'a',
+                                                 buffering=65536)
+            if len(self._files) > LogWriter.MAX_OPEN:
+                self._files.popitem(last=False)[1].close()
+        else:
+            self._files.move_to_end(test_name)
+
+        file.write(line)
+        if self.console:
+            self._output.append(line)
+
+    def flush(self) -> None:
+        """
+        Flushes log files and prints buffered records.
+        """
+        for file in self._files.values():
+            file.flush()
+
+        if self._output:
+            sys.stderr.write(''.join(self._output))
+            sys.stderr.flush()
+            self._output.clear()
+
+
 class eLogger(Logger):
     """
     Class that overrides standard Logging library.
@@ -90,6 +331,7 @@ class eLogger(Logger):
                  test_name: str,
                  start_time: str,
                  log_name: str = 'main',
+                 log_address: Address = None,
                  *args, **kwargs) -> None:
         """
         Initialization of Logger instance.
@@ -98,17 +340,29 @@ class eLogger(Logger):
             test_name (str): From test module, starts with "test_*".
             start_time (str): Test Session start time.
             log_name (str, optional): Logger name. Defaults to 'main'.
+            log_address (Address | None, optional): Address of session
+            log writer, records are written directly if None.
         """
         Logger.__init__(self, log_name, *args, **kwargs)
         self.__logger = logging.getLogger(log_name)
         self.__logger.setLevel(logging.DEBUG)
-        self.__logger.addHandler(S_StreamHandler())
-        self.__logger.addHandler(S_FileHandler(test_name, start_time))
-
         self.__test_name = test_name
         self.setLevel(logging.DEBUG)
-        self.addHandler(S_StreamHandler())
-        self.addHandler(S_FileHandler(test_name, start_time))
+
+        if log_address is None:
+            self.__handlers = [S_StreamHandler(),
+                               S_FileHandler(test_name, start_time)]
+            handlers = [S_StreamHandler(),
+                        S_FileHandler(test_name, start_time)]
+        else:
+            handler = S_SocketHandler.get(log_address)
+            handler.test_name = test_name
+            self.__handlers = handlers = [handler]
+
+        for handler in self.__handlers:
+            self.__logger.addHandler(handler)
+        for handler in handlers:
+            self.addHandler(handler)
 
     def start(self, *args) -> None:
         """
@@ -159,6 +413,19 @@ class eLogger(Logger):
                       f'AN EXCEPTION OCCURRED: {traceback}',
                       args)
 
+    def close(self) -> None:
+        """
+        Detaches and closes handlers of this logger and
+        those it attached to shared logger, so that
+        process running next test does not duplicate them.
+        """
+        for handler in self.handlers[:] + self.__handlers:
+            self.removeHandler(handler)
+            self.__logger.removeHandler(handler)
+            # Socket handler is reused by next test of the process.
+            if not isinstance(handler, S_SocketHandler):
+                handler.close()
+
     @classmethod
     def get_logger(cls) -> logging.Logger:
         """
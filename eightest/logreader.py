@@ -0,0 +1,206 @@
+import os
+import mmap
+
+from typing import List, Optional
+
+
+# Default number of lines in one window.
+PAGE_LINES = 500
+# Maximum number of bytes returned by a single read.
+MAX_BYTES = 1024 * 1024
+
+
+class LogWindow(object):
+    """
+    Part of a log file made of whole lines. Start and
+    end are byte offsets, client passes end back to
+    follow the file or start to page backwards.
+    """
+    def __init__(self,
+                 lines: List[str],
+                 start: int,
+                 end: int,
+                 size: int,
+                 reset: bool = False
+                 ) -> None:
+        """
+        Args:
+            lines (List[str]): Decoded lines without line breaks.
+            start (int): Offset of the first line.
+            end (int): Offset right after the last line.
+            size (int): File size at the time of reading.
+            reset (bool, optional): File has been truncated since
+            the previous window, lines shown so far are stale.
+        """
+        self.lines = lines
+        self.start = start
+        self.end = end
+        self.size = size
+        self.reset = reset
+
+    def serialize(self) -> dict:
+        """
+        Returns:
+            dict: JSON serializable form of the window.
+        """
+        return {
+            "loglines": self.lines,
+            "start": self.start,
+            "end": self.end,
+            "size": self.size,
+            "reset": self.reset
+        }
+
+
+class LogReader(object):
+    """
+    Reads windows of a log file without loading all
+    of it. Forward reads seek to offset, backward reads
+    search line breaks in memory mapped file.
+    """
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES) -> None:
+        """
+        Args:
+            path (str): Log file path.
+            max_bytes (int, optional): Maximum size of one window.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def head(self, count: int = PAGE_LINES) -> LogWindow:
+        """
+        Args:
+            count (int, optional): Maximum number of lines.
+
+        Returns:
+            LogWindow: First lines of the file.
+        """
+        return self.since(0, count)
+
+    def since(self, offset: int, count: int = PAGE_LINES) -> LogWindow:
+        """
+        Reads complete lines after given offset, line
+        still being written is left for the next read.
+        Offset beyond the end of a truncated file
+        starts reading from the beginning, window
+        is marked as reset then.
+
+        Args:
+            offset (int): Offset returned as end of previous window.
+            count (int, optional): Maximum number of lines.
+
+        Raises:
+            ValueError: When offset is negative.
+
+        Returns:
+            LogWindow: Lines following the offset.
+        """
+        if offset < 0:
+            raise ValueError(f'Negative offset: {offset}')
+
+        with open(self.path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if reset := offset > size:
+                offset = 0
+            file.seek(offset)
+            data = file.read(min(size - offset, self.max_bytes))
+
+        lines = data.split(b'\n')[:-1][:count]
+        if not lines and len(data) == self.max_bytes:
+            # Single line longer than the limit is split.
+            lines = [data]
+            end = offset + len(data)
+        else:
+            end = offset + sum(len(line) + 1 for line in lines)
+
+        return LogWindow(self._decode(lines), offset, end, size, reset)
+
+    def tail(self, count: int = PAGE_LINES) -> LogWindow:
+        """
+        Args:
+            count (int, optional): Maximum number of lines.
+
+        Returns:
+            LogWindow: Last complete lines of the file.
+        """
+        return self.before(None, count)
+
+    def before(self,
+               offset: Optional[int],
+               count: int = PAGE_LINES
+               ) -> LogWindow:
+        """
+        Reads complete lines preceding given offset.
+
+        Args:
+            offset (int | None): Offset returned as start of previous
+            window, None means end of the last complete line.
+            count (int, optional): Maximum number of lines.
+
+        Raises:
+            ValueError: When offset is negative.
+
+        Returns:
+            LogWindow: Lines preceding the offset.
+        """
+        if offset is not None and offset < 0:
+            raise ValueError(f'Negative offset: {offset}')
+
+        with open(self.path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return LogWindow([], 0, 0, 0)
+
+            with mmap.mmap(file.fileno(), size,
+                           access=mmap.ACCESS_READ) as data:
+                if offset is None:
+                    offset = data.rfind(b'\n') + 1
+                end = min(offset, size)
+                start = end
+                limit = max(end - self.max_bytes, 0)
+
+                for _ in range(count):
+                    if start <= limit:
+                        break
+                    start = max(data.rfind(b'\n', limit, start - 1) + 1,
+                                limit)
+
+                if start == limit > 0 and data[start - 1] != ord('\n'):
+                    # Line cut by the limit is left for the next page,
+                    # unless it is the only one, then it is split.
+                    boundary = data.find(b'\n', start, end) + 1
+                    if boundary < end:
+                        start = boundary
+
+                lines = data[start:end].split(b'\n')[:-1]
+
+        return LogWindow(self._decode(lines), start, end, size)
+
+    @staticmethod
+    def _decode(lines: List[bytes]) -> List[str]:
+        return [line.rstrip(b'\r').decode('utf-8', errors='replace')
+                for line in lines]
+
+
+def resolve_log(logs_path: str, log_folder: str, log_file: str) -> str:
+    """
+    Joins log path and makes sure it stays within logs folder.
+
+    Args:
+        logs_path (str): Folder of all test session logs.
+        log_folder (str): Test session folder name.
+        log_file (str): Log file name.
+
+    Raises:
+        FileNotFoundError: When path points outside of logs folder
+        or the file does not exist.
+
+    Returns:
+        str: Log file path.
+    """
+    root = os.path.realpath(logs_path)
+    path = os.path.realpath(os.path.join(root, log_folder, log_file))
+
+    if os.path.commonpath((root, path)) != root or not os.path.isfile(path):
+        raise FileNotFoundError(f'No such log file: {log_folder}/{log_file}')
+    return path
@@ -0,0 +1,442 @@
+import time
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from multiprocess import Pipe
+from multiprocess.connection import Connection, wait
+from multiprocess.context import BaseContext
+from eightest.logger import Address
+from eightest.process import TERMINATE_TIMEOUT, S_Worker
+from eightest.searcher import TestMethod
+from eightest.testcase import Status
+from eightest.zygote import bind
+
+
+class BatchSizer(object):
+    """
+    Adapts number of tests sent to worker in one message,
+    so that a batch takes roughly TARGET seconds.
+    """
+    # Desired wall time of one batch in seconds.
+    TARGET = 0.05
+    # Weight of the latest observation in the average.
+    SMOOTHING = 0.3
+
+    def __init__(self, maximum: int) -> None:
+        """
+        Args:
+            maximum (int): Maximum number of tests in a batch.
+        """
+        self.maximum = max(maximum, 1)
+        self.per_test: Optional[float] = None
+
+    def observe(self, elapsed: float, count: int) -> None:
+        """
+        Updates average time of a single test.
+
+        Args:
+            elapsed (float): Time in which tests were executed.
+            count (int): Number of executed tests.
+        """
+        per_test = elapsed / count
+        if self.per_test is None:
+            self.per_test = per_test
+        else:
+            self.per_test = (BatchSizer.SMOOTHING * per_test +
+                             (1 - BatchSizer.SMOOTHING) * self.per_test)
+
+    def size(self, pending: int, workers: int) -> int:
+        """
+        Args:
+            pending (int): Number of tests not dispatched yet.
+            workers (int): Number of workers sharing them.
+
+        Returns:
+            int: Number of tests for the next batch.
+        """
+        if self.maximum == 1 or self.per_test is None:
+            return 1
+
+        size = int(BatchSizer.TARGET / max(self.per_test, 1e-6))
+        size = min(size, self.maximum, pending // max(workers, 1))
+        return max(size, 1)
+
+
+def test_item(task) -> object:
+    """
+    Args:
+        task (Task): Task to be sent to worker.
+
+    Returns:
+        object: Test ID, (test ID, first run) for deferred rerun
+        or (test ID, first run, test method) for case of
+        parametrized test, which worker does not know.
+    """
+    test_method = task.test_method
+    if test_method.case is not None:
+        return (test_method.value, task.runs + 1, test_method)
+    if task.runs:
+        return (test_method.value, task.runs + 1)
+    return test_method.value
+
+
+def stop(worker: S_Worker, timeout: float = TERMINATE_TIMEOUT) -> None:
+    """
+    Joins worker which is expected to exit, terminates it
+    when it does not exit in time and kills it as a last
+    resort. Resources of the worker are freed afterwards.
+
+    Args:
+        worker (S_Worker): Started worker process.
+        timeout (float, optional): Time given to each step.
+    """
+    worker.join(timeout)
+    if worker.is_alive():
+        worker.terminate()
+        worker.join(timeout)
+    if worker.is_alive():
+        worker.kill()
+        worker.join()
+    worker.close()
+
+
+class WorkerPool(object):
+    """
+    Fixed size pool of long-lived worker processes.
+    Keeps track of the batch of tasks each worker is busy with,
+    the first task of a batch is the one being executed.
+    """
+    def __init__(self,
+                 size: int,
+                 tests: Dict[str, TestMethod],
+                 session_time: str,
+                 context: BaseContext = None,
+                 on_start: Callable = None,
+                 log_address: Address = None,
+                 max_runs: int = None,
+                 profile: bool = False
+                 ) -> None:
+        """
+        Args:
+            size (int): Number of worker processes.
+            tests (Dict[str, TestMethod]): Test methods by their IDs.
+            session_time (str): Test Session start time.
+            context (BaseContext, optional): Context used to start workers.
+            on_start (Callable, optional): Called with task
+            when worker starts executing it.
+            log_address (Address, optional): Address of session log writer.
+            max_runs (int, optional): Maximum number of runs of a test
+            in worker, defaults to MAX_RERUNS env variable.
+            profile (bool, optional): Whether tests run under profiler.
+        """
+        self.size = size
+        self.workers: Dict[Connection, S_Worker] = {}
+        self.busy: Dict[Connection, Deque] = {}
+        self.orphaned: List = []
+        self._progress: Dict[Connection, float] = {}
+        # Scope releases held back until worker finishes its batch.
+        self._releases: Dict[Connection, List[str]] = {}
+        # Tasks whose workers have been killed by watchdog.
+        self._killed: Dict[Connection, object] = {}
+        self._tests = tests
+        self._session_time = session_time
+        self._context = context
+        self._on_start = on_start
+        self._log_address = log_address
+        self._max_runs = max_runs
+        self._profile = profile
+        self._sizer = BatchSizer(1)
+
+    def start(self, batch_size: int = 1) -> None:
+        """
+        Spawns all worker processes of the pool.
+
+        Args:
+            batch_size (int, optional): Maximum number
+            of tests sent to worker at once.
+        """
+        self._sizer = BatchSizer(batch_size)
+        for _ in range(self.size):
+            self._spawn()
+
+    def _spawn(self) -> Connection:
+        """
+        Starts new worker process.
+
+        Returns:
+            Connection: Parent side of worker's pipe.
+        """
+        parent_conn, child_conn = Pipe()
+        worker = S_Worker(tests=self._tests,
+                          session_time=self._session_time,
+                          pipe_conn=child_conn,
+                          log_address=self._log_address,
+                          max_runs=self._max_runs,
+                          profile=self._profile)
+        if self._context is not None:
+            bind(worker, self._context)
+        worker.start()
+        child_conn.close()
+        self.workers[parent_conn] = worker
+        return parent_conn
+
+    def idle(self) -> Optional[Connection]:
+        """
+        Returns:
+            Connection | None: Connection of any idle worker.
+        """
+        for conn, worker in list(self.workers.items()):
+            if conn in self.busy:
+                continue
+            # Worker might have been killed right after its last result.
+            if not worker.is_alive():
+                return self._replace(conn)
+            return conn
+        return None
+
+    def batch_size(self, pending: int) -> int:
+        """
+        Args:
+            pending (int): Number of tests not dispatched yet.
+
+        Returns:
+            int: Number of tests for the next batch.
+        """
+        return self._sizer.size(pending, len(self.workers))
+
+    def submit(self, conn: Connection, tasks: List) -> None:
+        """
+        Hands batch of tasks over to the given idle worker.
+
+        Args:
+            conn (Connection): Worker connection.
+            tasks (List[Task]): Tasks to be executed in order.
+        """
+        for task in tasks:
+            task.assign(self.workers[conn], conn)
+
+        conn.send([test_item(task) for task in tasks])
+        self.busy[conn] = deque(tasks)
+        self._progress[conn] = time.perf_counter()
+        self._begin(tasks[0])
+
+    def release(self, scopes: List[str]) -> None:
+        """
+        Lets all workers know that no more tests of given
+        scopes are coming. Idle worker is told right away,
+        busy one once it has finished its batch, so that
+        nothing piles up unread in pipe of busy worker.
+
+        Args:
+            scopes (List[str]): Keys of exhausted scopes.
+        """
+        for conn in self.workers:
+            if conn in self.busy:
+                self._releases.setdefault(conn, []).extend(scopes)
+            else:
+                self._send_release(conn, scopes)
+
+    def _send_release(self, conn: Connection, scopes: List[str]) -> None:
+        """
+        Args:
+            conn (Connection): Connection of idle worker.
+            scopes (List[str]): Keys of exhausted scopes.
+        """
+        try:
+            conn.send(set(scopes))
+        except OSError:
+            pass
+
+    def _begin(self, task) -> None:
+        """
+        Marks start of task execution in worker, so that
+        each task of the batch gets its own deadline.
+
+        Args:
+            task (Task): Task which the worker starts next.
+        """
+        task.duration = time.perf_counter()
+        if self._on_start is not None:
+            self._on_start(task)
+
+    def wait(self, timeout: Optional[float] = None) -> List[Connection]:
+        """
+        Waits until any busy worker sends results back or dies.
+
+        Args:
+            timeout (float | None): Maximum waiting time in seconds.
+
+        Returns:
+            List[Connection]: Connections of workers ready to be collected.
+        """
+        sentinels = {self.workers[conn].sentinel: conn for conn in self.busy}
+        ready_list = wait(list(self.busy) + list(sentinels), timeout)
+        return list(dict.fromkeys(sentinels.get(r, r) for r in ready_list))
+
+    def collect(self,
+                ready_list: List[Connection]
+                ) -> List[Tuple[object, Optional[tuple]]]:
+        """
+        Receives results from ready workers, all results
+        sent by dead worker are received before its death
+        is charged. Tasks of dead worker's batch which have
+        not been executed yet are moved to orphaned list.
+
+        Args:
+            ready_list (List[Connection]): Result of wait method.
+
+        Returns:
+            List[Tuple[Task, tuple | None]]: Finished tasks along with
+            their results, None when worker died during test.
+        """
+        finished = []
+
+        for conn in ready_list:
+            if conn not in self.busy:
+                continue
+
+            try:
+                while conn in self.busy and conn.poll():
+                    finished.extend(self._unpack(conn, conn.recv()))
+                alive = conn not in self.busy or self.workers[conn].is_alive()
+            except (EOFError, OSError):
+                alive = False
+
+            if not alive:
+                finished.extend(self._died(conn))
+                self._replace(conn)
+
+        return finished
+
+    def _unpack(self,
+                conn: Connection,
+                responses: List[Tuple[str, int, float, int, tuple]]
+                ) -> List[Tuple[object, tuple]]:
+        """
+        Pairs compact worker responses with tasks of its batch.
+        Worker reports each test before it starts the next one,
+        so the next task of the batch begins right away.
+
+        Args:
+            conn (Connection): Worker connection.
+            responses (List[Tuple[str, int, float, int, tuple]]): Test
+            IDs, status values, durations, number of runs and usages.
+
+        Returns:
+            List[Tuple[Task, tuple]]: Finished tasks along with results.
+        """
+        batch = self.busy[conn]
+        finished = []
+        now = time.perf_counter()
+        self._sizer.observe(now - self._progress[conn], len(responses))
+        self._progress[conn] = now
+
+        for value, status, duration, retries, usage in responses:
+            task = batch.popleft()
+            if task.test_method.value != value:
+                raise ValueError(f'Wrong test ID from worker: {value}')
+
+            response = (task.test_method.name,
+                        Status(status),
+                        duration,
+                        retries,
+                        usage)
+            finished.append((task, response))
+
+        if batch:
+            self._begin(batch[0])
+        else:
+            del self.busy[conn]
+            if scopes := self._releases.pop(conn, None):
+                self._send_release(conn, scopes)
+
+        return finished
+
+    def renew(self, conn: Connection) -> Connection:
+        """
+        Replaces idle worker with a new one, so that
+        next test runs in a fresh process.
+
+        Args:
+            conn (Connection): Connection of idle worker.
+
+        Returns:
+            Connection: Connection of the new worker.
+        """
+        try:
+            conn.send(None)
+        except OSError:
+            self.workers[conn].terminate()
+        return self._replace(conn)
+
+    def kill(self, task) -> None:
+        """
+        Kills worker executing task which has timed out.
+
+        Args:
+            task (Task): Expired task.
+        """
+        self._killed[task.connection] = task
+        task.expire()
+
+    def _died(self, conn: Connection) -> List[Tuple[object, None]]:
+        """
+        Charges death of busy worker to the task being executed
+        and moves the rest of its batch to orphaned list. When
+        worker was killed for a task which has finished in the
+        meantime, no task is charged, the whole rest is orphaned.
+
+        Args:
+            conn (Connection): Connection of dead worker.
+
+        Returns:
+            List[Tuple[Task, None]]: Task which died with the worker.
+        """
+        batch = self.busy.pop(conn, None)
+        killed = self._killed.pop(conn, None)
+        if not batch:
+            return []
+
+        finished = []
+        if killed is None or killed is batch[0]:
+            finished.append((batch.popleft(), None))
+        self.orphaned.extend(batch)
+        return finished
+
+    def _replace(self, conn: Connection) -> Connection:
+        """
+        Cleans up dead or exiting worker and spawns a new one.
+
+        Args:
+            conn (Connection): Connection of the worker.
+
+        Returns:
+            Connection: Connection of the new worker.
+        """
+        worker = self.workers.pop(conn)
+        self._progress.pop(conn, None)
+        self._releases.pop(conn, None)
+        self._killed.pop(conn, None)
+        stop(worker, 1)
+        conn.close()
+        return self._spawn()
+
+    def close(self) -> None:
+        """
+        Stops all workers, terminates those still busy.
+        """
+        for conn, worker in self.workers.items():
+            if conn in self.busy:
+                worker.terminate()
+            else:
+                try:
+                    conn.send(None)
+                except OSError:
+                    worker.terminate()
+
+        for conn, worker in self.workers.items():
+            stop(worker)
+            conn.close()
+
+        self.workers.clear()
+        self.busy.clear()
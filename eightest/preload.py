@@ -0,0 +1,7 @@
+"""
+Imported only by zygote (forkserver) process
+in order to preload modules shared by test processes.
+"""
+from eightest.zygote import preload
+
+preload()
@@ -1,12 +1,97 @@
 import os
 import time
+import cProfile
+import importlib
 
+from functools import partial
 from traceback import format_exc
-from eightest.logger import eLogger
+from typing import Callable, Dict, Optional, Tuple
+from eightest.fixtures import Fixtures
+from eightest.logger import Address, eLogger
+from eightest.profiler import profile_path
+from eightest.searcher import TestMethod
 from eightest.testcase import Status
+from eightest.usage import UsageMeter
 from multiprocess import (Semaphore,
                           Process,
-                          Pipe)
+                          Pipe,
+                          Value)
+
+# Seconds to wait for terminated process to exit.
+TERMINATE_TIMEOUT = 5
+
+
+def execute(test_name: str,
+            session_time: str,
+            target: Callable,
+            log_address: Address = None,
+            max_runs: int = None,
+            first_run: int = 1,
+            profile: bool = False
+            ) -> Tuple[str, Status, float, int, Optional[tuple]]:
+    """
+    Runs test target along with logger. Failed or
+    errored test is rerun up to max_runs times.
+    Resources consumed by all runs are measured.
+    When profiled, profile of all runs is written
+    into session log folder.
+
+    Args:
+        test_name (str): From test module, starts with "test_*".
+        session_time (str): Test Session start time.
+        target (Callable): Test callable without arguments.
+        log_address (Address | None, optional): Address of session log writer.
+        max_runs (int | None, optional): Maximum number of runs in this
+        process. Defaults to MAX_RERUNS env variable.
+        first_run (int, optional): Number of the first run, greater
+        than 1 for deferred reruns.
+        profile (bool, optional): Whether target runs under cProfile.
+
+    Returns:
+        Tuple[str, Status, float, int, tuple | None]: Test name,
+        status, duration of last run, number of the last run
+        and resource usage in compact form.
+    """
+    log = eLogger(test_name, session_time, log_address=log_address)
+    meter = UsageMeter()
+    profiler = cProfile.Profile() if profile else None
+    if max_runs is None:
+        max_runs = int(os.getenv('MAX_RERUNS'))
+    NO_RUN = first_run - 1
+    LAST_RUN = NO_RUN + max_runs
+    status = Status.NOTRUN
+    meter.start()
+
+    while NO_RUN < LAST_RUN:
+        start = time.perf_counter()
+        NO_RUN += 1
+
+        try:
+            log.start()
+            status = Status.RUNNING
+            if profiler is None:
+                target()
+            else:
+                profiler.runcall(target)
+
+        except Exception as e:
+            log.exception(format_exc())
+            if isinstance(e, AssertionError):
+                status = Status.FAILED
+            else:
+                status = Status.ERROR
+        else:
+            status = Status.PASSED
+            break
+
+        finally:
+            duration = log.end(start, status, NO_RUN)
+
+    usage = meter.stop()
+    if profiler is not None:
+        profiler.dump_stats(profile_path(session_time, test_name))
+    log.close()
+    return test_name, status, duration, NO_RUN, usage.astuple()
 
 
 class S_Process(Process):
@@ -21,6 +106,11 @@ class S_Process(Process):
                  session_time: str,
                  semaphore: Semaphore,
                  pipe_conn: Pipe,
+                 log_address: Address = None,
+                 max_runs: int = None,
+                 first_run: int = 1,
+                 profile: bool = False,
+                 test_class: type = None,
                  *args,
                  **kwargs
                  ) -> None:
@@ -34,60 +124,69 @@ class S_Process(Process):
             start_time (str): Test Session start time.
             semaphore (Semaphore): Manages an internal counter
                                    of available processes.
+            log_address (Address | None, optional): Address of session
+                                                log writer.
+            max_runs (int | None, optional): Maximum number of runs.
+            first_run (int, optional): Number of the first run.
+            profile (bool, optional): Whether test runs under profiler.
+            test_class (type, optional): Class of the test, its scoped
+            setup hooks are run around the test.
         """
         Process.__init__(self, *args, **kwargs)
         self.__child_conn = pipe_conn
         self.__test_name = test_name
+        self.__test_class = test_class
         self.__semaphore = semaphore
+        # Set by the child while it holds the semaphore.
+        self.__holding = Value('b', 0, lock=False)
         self.__session_time = session_time
-        self.__status = Status.NOTRUN
+        self.__log_address = log_address
+        self.__runs = (max_runs, first_run, profile)
 
     def run(self) -> None:
         """
         Starts process along with logger. Sends
         response back to parent process through Pipe.
+        Scopes of the test are torn down after it.
         """
         self.__semaphore.acquire()
+        self.__holding.value = 1
         self.__child_conn.send(0)
-        log = eLogger(self.__test_name, self.__session_time)
-        MAX_RERUNS = int(os.getenv('MAX_RERUNS'))
-        NO_RUN = 0
-
-        while NO_RUN < MAX_RERUNS:
-            start = time.perf_counter()
-            NO_RUN += 1
-
-            try:
-                log.start()
-                self.__status = Status.RUNNING
-                Process.run(self)
-
-            except Exception as e:
-                log.exception(format_exc())
-                if isinstance(e, AssertionError):
-                    self.__status = Status.FAILED
-                else:
-                    self.__status = Status.ERROR
-            else:
-                self.__status = Status.PASSED
-                break
 
-            finally:
-                duration = log.end(start, self.__status, NO_RUN)
+        target = partial(Process.run, self)
+        fixtures = Fixtures()
+        if self.__test_class is not None:
+            target = partial(fixtures.run, self.__test_class, target)
 
-        self.__child_conn.send((self.__test_name,
-                               self.__status,
-                               duration,
-                               NO_RUN))
+        result = execute(self.__test_name,
+                         self.__session_time,
+                         target,
+                         self.__log_address,
+                         *self.__runs)
+        fixtures.close()
+
+        self.__child_conn.send(result)
         self.__child_conn.close()
+        self.__holding.value = 0
         self.__semaphore.release()
 
     def terminate(self) -> None:
         """
-        Terminates process and releases semaphore.
+        Terminates process, killed when it does not exit
+        in time, and releases semaphore on its behalf,
+        only when the process died holding it.
+        Process still waiting for the semaphore or
+        the one which has already released it is left
+        as it is, so the semaphore is never released twice.
         """
-        self.__semaphore.release()
         super().terminate()
+        self.join(TERMINATE_TIMEOUT)
+        if self.exitcode is None:
+            self.kill()
+            self.join()
+        if self.__holding.value:
+            self.__holding.value = 0
+            self.__semaphore.release()
 
     @property
     def test_name(self) -> str:
@@ -98,3 +197,108 @@ class S_Process(Process):
             str: test name.
         """
         return self.__test_name
+
+
+class S_Worker(Process):
+    """
+    Long-lived worker process of the pool execution mode.
+    Receives batches of test IDs from parent through Pipe,
+    runs them one after another and streams back results.
+    """
+
+    def __init__(self,
+                 tests: Dict[str, TestMethod],
+                 session_time: str,
+                 pipe_conn: Pipe,
+                 log_address: Address = None,
+                 max_runs: int = None,
+                 profile: bool = False,
+                 *args,
+                 **kwargs
+                 ) -> None:
+        """
+        Initialization of Worker instance.
+
+        Args:
+            tests (Dict[str, TestMethod]): Test methods by their IDs.
+            session_time (str): Test Session start time.
+            pipe_conn (Pipe): Pipe child connection.
+            log_address (Address | None, optional): Address of session
+                                                log writer.
+            max_runs (int | None, optional): Maximum number of runs.
+            profile (bool, optional): Whether tests run under profiler.
+        """
+        Process.__init__(self, *args, **kwargs)
+        self.__child_conn = pipe_conn
+        self.__tests = tests
+        self.__session_time = session_time
+        self.__log_address = log_address
+        self.__max_runs = max_runs
+        self.__profile = profile
+
+    def run(self) -> None:
+        """
+        Waits for batches of test IDs until None is received.
+        Deferred rerun comes as (test ID, first run) tuple,
+        case of parametrized test along with its test method.
+        Set of scope keys releases fixtures of scopes which
+        have no tests left, the rest is released at the end.
+        Result of each test is sent as list with compact
+        (test ID, status value, duration, runs, usage) tuple
+        before the next test starts, so that parent always
+        knows which test of the batch is running and
+        watches its timeout.
+        """
+        self.__fixtures = Fixtures()
+
+        while (batch := self.__child_conn.recv()) is not None:
+            if isinstance(batch, set):
+                self.__fixtures.release(batch)
+                continue
+
+            for item in batch:
+                value, first_run, *case = (item if isinstance(item, tuple)
+                                           else (item, 1))
+                test_method = case[0] if case else self.__tests[value]
+                _, status, duration, runs, usage = self.run_test(
+                    test_method, first_run)
+                self.__child_conn.send(
+                    [(value, status.value, duration, runs, usage)])
+
+        self.__fixtures.close()
+        self.__child_conn.close()
+
+    def run_test(self,
+                 test_method: TestMethod,
+                 first_run: int = 1
+                 ) -> Tuple[str, Status, float, int, Optional[tuple]]:
+        """
+        Imports test module, creates test instance and executes
+        test method in this process, within its scoped fixtures.
+
+        Args:
+            test_method (TestMethod): Test to be executed.
+            first_run (int, optional): Number of the first run.
+
+        Returns:
+            Tuple[str, Status, float, int, tuple | None]: Test result.
+        """
+        try:
+            module = importlib.import_module(test_method.module_path)
+            _class = getattr(module, test_method.test_class)
+            _test_instance = _class(test_method.test_name)
+            target = getattr(_class, test_method.test_name)
+
+        except Exception:
+            print(format_exc())
+            return test_method.name, Status.ERROR, 0, first_run, None
+
+        target = partial(target, _test_instance,
+                         **(test_method.params or {}))
+        return execute(test_method.name,
+                       self.__session_time,
+                       partial(self.__fixtures.run, _class, target),
+                       self.__log_address,
+                       self.__max_runs,
+                       first_run,
+                       self.__profile)
@@ -0,0 +1,165 @@
+import io
+import os
+import glob
+import pstats
+
+from typing import Dict, List, Tuple
+
+
+# Extension of per-test profile files.
+PROFILE_SUFFIX = '.pstats'
+# Name of aggregated report in session log folder.
+REPORT_NAME = 'profile_report.txt'
+
+# Function key as used by pstats: file, line and name.
+Function = Tuple[str, int, str]
+# Name of profiler's own function recorded in every profile.
+PROFILER_FUNCTION = "<method 'disable' of '_lsprof.Profiler' objects>"
+
+
+def profile_path(session_time: str, test_name: str) -> str:
+    """
+    Args:
+        session_time (str): Test Session start time.
+        test_name (str): From test module, starts with "test_*".
+
+    Returns:
+        str: Path of test's profile in session log folder.
+    """
+    folder_path = os.path.join('logs', f'test_session_{session_time}')
+    os.makedirs(folder_path, exist_ok=True)
+    return os.path.join(folder_path, f'{test_name}{PROFILE_SUFFIX}')
+
+
+class ProfileReport(object):
+    """
+    Aggregates profiles of all tests of a session. Lists
+    functions with the highest cumulative time across the
+    session along with tests spending most time in them,
+    so that slow code shared by many tests, such as
+    fixtures, stands out. Then lists hot spots of each
+    test by time spent in function itself.
+    """
+    def __init__(self, folder_path: str) -> None:
+        """
+        Args:
+            folder_path (str): Session log folder with profiles.
+        """
+        self.folder_path = folder_path
+        self.tests: Dict[str, pstats.Stats] = {}
+
+        for path in sorted(glob.glob(os.path.join(folder_path,
+                                                  f'*{PROFILE_SUFFIX}'))):
+            test_name = os.path.basename(path)[:-len(PROFILE_SUFFIX)]
+            try:
+                self.tests[test_name] = pstats.Stats(path)
+            except (OSError, TypeError, ValueError, EOFError):
+                # Profile of a test killed while writing it.
+                continue
+
+    def hotspots(self, limit: int = 20) -> List[Tuple[Function, float, int]]:
+        """
+        Args:
+            limit (int, optional): Maximum number of functions.
+
+        Returns:
+            List[Tuple[Function, float, int]]: Functions with the highest
+            cumulative time summed over tests and number of tests
+            calling them.
+        """
+        totals: Dict[Function, List] = {}
+        for stats in self.tests.values():
+            for function, (_, _, _, cumulative, _) in stats.stats.items():
+                if function[2] == PROFILER_FUNCTION:
+                    continue
+                total = totals.setdefault(function, [0.0, 0])
+                total[0] += cumulative
+                total[1] += 1
+
+        ranked = sorted(totals.items(), key=lambda item: -item[1][0])
+        return [(function, total, count)
+                for function, (total, count) in ranked[:limit]]
+
+    def callers(self,
+                function: Function,
+                limit: int = 5
+                ) -> List[Tuple[str, float]]:
+        """
+        Args:
+            function (Function): Particular function.
+            limit (int, optional): Maximum number of tests.
+
+        Returns:
+            List[Tuple[str, float]]: Tests spending most cumulative
+            time in the function and that time.
+        """
+        times = [(test_name, stats.stats[function][3])
+                 for test_name, stats in self.tests.items()
+                 if function in stats.stats]
+        return sorted(times, key=lambda item: -item[1])[:limit]
+
+    def test_hotspots(self,
+                      test_name: str,
+                      limit: int = 3
+                      ) -> List[Tuple[Function, float]]:
+        """
+        Args:
+            test_name (str): Particular test.
+            limit (int, optional): Maximum number of functions.
+
+        Returns:
+            List[Tuple[Function, float]]: Functions in which
+            the test spends most time itself.
+        """
+        times = [(function, values[2])
+                 for function, values in self.tests[test_name].stats.items()
+                 if function[2] != PROFILER_FUNCTION]
+        return sorted(times, key=lambda item: -item[1])[:limit]
+
+    def render(self, limit: int = 20) -> str:
+        """
+        Args:
+            limit (int, optional): Number of listed hot spots.
+
+        Returns:
+            str: Report in text form.
+        """
+        output = [f'Profiled tests: {len(self.tests)}', '',
+                  'Top functions by cumulative time:']
+
+        for function, total, count in self.hotspots(limit):
+            output.append(f'{total:10.4f}s  {count:5d} test(s)  '
+                          f'{pstats.func_std_string(function)}')
+            for test_name, time in self.callers(function):
+                output.append(f'{"":>12}{time:10.4f}s  {test_name}')
+
+        output.extend(['', 'Hot spots of tests by own time:'])
+        for test_name in self.tests:
+            output.append(test_name)
+            for function, time in self.test_hotspots(test_name):
+                output.append(f'{time:10.4f}s  '
+                              f'{pstats.func_std_string(function)}')
+
+        if self.tests:
+            stream = io.StringIO()
+            stats = pstats.Stats(stream=stream)
+            stats.add(*self.tests.values())
+            stats.sort_stats('cumulative').print_stats(limit)
+            output.extend(['', 'Session profile:', stream.getvalue()])
+
+        return '\n'.join(output) + '\n'
+
+    def write(self, limit: int = 20) -> str:
+        """
+        Writes report into session log folder.
+
+        Args:
+            limit (int, optional): Number of listed hot spots.
+
+        Returns:
+            str: Report file path.
+        """
+        path = os.path.join(self.folder_path, REPORT_NAME)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.render(limit))
+        return path
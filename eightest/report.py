@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+
+from typing import Iterable, List
+
+
+def save_report(report: dict, path: str) -> None:
+    """
+    Writes session report as JSON file.
+
+    Args:
+        report (dict): Report returned by Runner.get_report.
+        path (str): Report file path.
+    """
+    if folder := os.path.dirname(path):
+        os.makedirs(folder, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+    os.replace(temp_path, path)
+
+
+def load_report(path: str) -> dict:
+    """
+    Args:
+        path (str): Report file path.
+
+    Returns:
+        dict: Session report.
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def split_digest(keys: Iterable[str]) -> str:
+    """
+    Args:
+        keys (Iterable[str]): Keys of all tests split into shards.
+
+    Returns:
+        str: Digest of the test keys, independent of their order.
+    """
+    return hashlib.sha256('\n'.join(sorted(keys)).encode('utf-8')).hexdigest()
+
+
+def duplicates(items: Iterable[object]) -> List[object]:
+    """
+    Args:
+        items (Iterable[object]): Hashable items.
+
+    Returns:
+        List[object]: Items which occur more than once, sorted.
+    """
+    seen, repeated = set(), set()
+    for item in items:
+        (repeated if item in seen else seen).add(item)
+    return sorted(repeated)
+
+
+def merge_reports(reports: Iterable[dict]) -> dict:
+    """
+    Combines reports of shards into single session report.
+    Shards must come from the same split of tests and
+    together cover each of its tests exactly once.
+
+    Args:
+        reports (Iterable[dict]): Reports of the shards.
+
+    Raises:
+        ValueError: When reports come from different splits, shard
+        is missing or reported more than once, or test is missing
+        or duplicated across shards.
+
+    Returns:
+        dict: Merged session report.
+    """
+    reports = list(reports)
+    totals = {report['shard'][1] for report in reports if report['shard']}
+    if len(totals) > 1:
+        raise ValueError('Reports come from different numbers of shards.')
+    splits = {json.dumps(report.get('split'), sort_keys=True)
+              for report in reports}
+    if len(splits) > 1:
+        raise ValueError('Reports come from different splits of tests.')
+
+    shards = sorted(report['shard'][0] for report in reports
+                    if report['shard'])
+    if repeated := duplicates(shards):
+        raise ValueError(f'Shards reported more than once: {repeated}')
+    if totals and (missing := sorted(set(range(1, totals.pop() + 1))
+                                     - set(shards))):
+        raise ValueError(f'Shards missing: {missing}')
+
+    tests = [key for report in reports for key in report.get('tests') or ()]
+    if repeated := duplicates(tests):
+        raise ValueError(f'Tests in more than one shard: {repeated}')
+    if (split := reports[0].get('split') if reports else None) is not None:
+        if (len(tests) != split['total']
+           or split_digest(tests) != split['digest']):
+            raise ValueError(f'Shards cover {len(tests)} of '
+                             f'{split["total"]} tests of the split.')
+
+    results = [result['test_key'] for report in reports
+               for result in report['results']]
+    if repeated := duplicates(results):
+        raise ValueError(f'Tests reported more than once: {repeated}')
+
+    merged = {
+        "session_time": min((report['session_time'] for report in reports),
+                            default=None),
+        "shards": shards,
+        "counters": {},
+        "results": []
+    }
+
+    for report in reports:
+        for counter, value in report['counters'].items():
+            merged['counters'][counter] = (
+                merged['counters'].get(counter, 0) + value)
+        merged['results'].extend(report['results'])
+
+    merged['results'].sort(key=lambda result: result['test_key'])
+    return merged
+
+
+def summary(report: dict) -> List[str]:
+    """
+    Args:
+        report (dict): Session report.
+
+    Returns:
+        List[str]: Results and counters in form of str outputs.
+    """
+    output = [f"Test Name: {result['test_name']} " +
+              f"Result: {result['status']} " +
+              f"Duration: {result['duration']} " +
+              f"Retries: {result['retries']}"
+              for result in report['results']]
+
+    output.append(', '.join(f'{counter}: {value}' for counter, value
+                            in report['counters'].items()))
+    return output
+
+
+def argsparser(args: List[str] = None) -> None:
+    import pprint
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='eightest merge')
+    parser.add_argument('reports', metavar='REPORT', nargs='+',
+                        help='report files of the shards')
+    parser.add_argument('-o', metavar='FILE', default=None,
+                        help='file merged report is written to')
+    args = parser.parse_args(args)
+
+    try:
+        report = merge_reports(load_report(path) for path in args.reports)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.o is not None:
+        save_report(report, args.o)
+    pprint.pprint(summary(report))
+
+
+if __name__ == "__main__":
+    argsparser()
@@ -1,24 +1,47 @@
 import os
 import time
-import jsons
+import heapq
 import pprint
 import psutil
 import importlib
 import itertools
-import traceback
+import multiprocess
 
 from ast import Module
-from threading import Thread
-from typing import List, Tuple
+from collections import deque
+from traceback import format_exc
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 from multiprocess import Semaphore, Pipe
-from eightest.process import S_Process
+from multiprocess.connection import wait
+from multiprocess.context import BaseContext
+from eightest.controller import ConcurrencyController
+from eightest.database import ResultStore
+from eightest.distributed import RemotePool, RemoteWorker, parse_address
+from eightest.events import EventStream
+from eightest.fixtures import ScopeCounter
+from eightest.logger import Address, LogWriter
+from eightest.pool import WorkerPool
+from eightest.profiler import ProfileReport
+from eightest.process import S_Process, S_Worker
+from eightest.report import save_report, split_digest
+from eightest.scheduler import (DurationHistory, RerunPolicy, longest_first,
+                                parse_shard, select_shard)
+from eightest.watchdog import Watchdog
+from eightest.zygote import bind, get_context
 from eightest.utilities import get_time
-from eightest.searcher import TestMethod, create_tree
+from eightest.searcher import (ImportGraph, TestMethod, create_tree,
+                               get_changed_files, get_module_name)
 from eightest.testcase import Status, TestCase
+from eightest.usage import ResourceUsage
 
-from eightest.utilities import (load_env_file,
+from eightest.utilities import (ROOT_DIR,
+                                load_env_file,
                                 set_cpu_count)
 
+# Seconds finished test process gets to exit on its own,
+# threads left running by the test may keep it alive.
+EXIT_TIMEOUT = 1
+
 
 class Result(object):
     """
@@ -38,6 +61,20 @@ class Result(object):
         self.test_name: str = None
         self.duration: float = None
         self.retries: int = 1
+        self.usage: ResourceUsage = None
+
+    def serialize(self) -> dict:
+        """
+        Returns:
+            dict: Compact JSON serializable form of the result.
+        """
+        return {
+            "test_name": self.test_name,
+            "status": self.status.name,
+            "duration": self.duration,
+            "retries": self.retries,
+            "usage": self.usage and self.usage.serialize()
+        }
 
 
 class Task(object):
@@ -49,7 +86,8 @@ class Task(object):
                  process: S_Process,
                  instance: TestCase,
                  pipe_conn: Pipe,
-                 result: Result
+                 result: Result,
+                 test_method: TestMethod = None
                  ) -> None:
         """
         Args:
@@ -57,22 +95,30 @@ class Task(object):
             instance (TestCase): Test instance object.
             pipe_conn (Pipe): Pipe child connection.
             result (Result): Test result object.
+            test_method (TestMethod, optional): Test to be executed.
         """
         self.process = process
         self.instance = instance
         self.result = result
+        self.test_method = test_method
         self.duration = None
+        self.expired = False
+        # Whether duration was measured by the test process,
+        # crashed and timed out tests have no real timing.
+        self.measured = False
+        self.worker: Optional[int] = None
+        # Number of finished runs, including deferred reruns.
+        self.runs = 0
         self._pipe_conn = pipe_conn
 
     def run(self) -> None:
         """
-        Starts process if not running, waits
-        until receives message from child process
-        that it had started execution through pipe.
+        Starts process if not running. Process notifies
+        through pipe when it has started test execution,
+        which is handled by receive method.
 
         Raises:
             ChildProcessError: When process is already running.
-            ValueError: When received wrong process response value.
             Exception: When process could not be started.
         """
         if self.process.is_alive():
@@ -80,56 +126,174 @@ class Task(object):
 
         try:
             self.process.start()
-            if (resp := self._pipe_conn.recv()) != 0:
-                raise ValueError(f'Wrong return value from process: {resp}')
-
-            self.duration = time.perf_counter()
-            self.result.status = Status.RUNNING
-            self.result.test_name = self.process.test_name
+            self.worker = self.process.pid
 
         except Exception:
             message = f'Could not start process: {self.process}.'
             # log.error(message)
             raise Exception(message)
 
-    def join(self, timeout: int = 0) -> None:
+    def receive(self) -> bool:
+        """
+        Receives message from child process, either
+        notification that test execution has started
+        or the test result.
+
+        Returns:
+            bool: True when test result was received.
+        """
+        if (resp := self._pipe_conn.recv()) == 0:
+            self.duration = time.perf_counter()
+            self.result.status = Status.RUNNING
+            self.result.test_name = self.process.test_name
+            return False
+
+        self.set_result(resp)
+        return True
+
+    def assign(self, worker: S_Worker, pipe_conn: Pipe) -> None:
         """
-        When process has finished its work, join it
-        and call set result method.
+        Assigns task to the pool worker which is going
+        to execute it. Start time is set by the pool
+        once worker gets to this task.
+
+        Args:
+            worker (S_Worker): Idle worker process.
+            pipe_conn (Pipe): Pipe parent connection of the worker.
+        """
+        self.process = worker
+        self.worker = worker.pid
+        self._pipe_conn = pipe_conn
+        self.result.status = Status.RUNNING
+        self.result.test_name = self.test_method.name
+
+    def join(self, timeout: int = None) -> None:
+        """
+        When process has finished its work, join it.
+        Result is expected to be already received.
 
         Args:
             timeout (int): Time after which
             the process is to be joined.
         """
         self.process.join(timeout)
-        self._set_result()
 
-    def terminate(self, timeout: int) -> None:
+    def terminate(self) -> None:
         """
         Terminates process by force.
         """
         self.process.terminate()
+        self.set_timeout()
+
+    def expire(self) -> None:
+        """
+        Called by watchdog when test exceeds its timeout.
+        Terminates process, timeout result is set once
+        runner notices the process has died.
+        """
+        self.expired = True
+        self.process.terminate()
+
+    def set_timeout(self) -> None:
+        """
+        Sets timeout result along with actual elapsed time.
+        """
         self.result.status = Status.TIMEOUT
-        self.result.duration = timeout
+        self.result.duration = 0
         self.result.retries = 1
+        self.result.usage = None
+        if self.duration is not None:
+            self.result.duration = round(
+                time.perf_counter() - self.duration, 2)
+
+    def attach(self,
+               process: S_Process,
+               instance: TestCase,
+               pipe_conn: Pipe
+               ) -> None:
+        """
+        Attaches process created right before task is run.
 
-    def _set_result(self) -> None:
+        Args:
+            process (S_Process): Process object.
+            instance (TestCase): Test instance object.
+            pipe_conn (Pipe): Pipe parent connection.
         """
-        Gets result from process object of finished test
-        and sets to internal results object.
+        self.process = process
+        self.instance = instance
+        self._pipe_conn = pipe_conn
 
-        Raises:
-            ChildProcessError: When no response is available from process.
+    def release(self) -> None:
         """
-        if not self._pipe_conn.poll():
-            message = f'Could not get response from process: {self.process}.'
-            # log.error(message)
-            raise ChildProcessError(message)
+        Drops references to process, test instance
+        and pipe, so completed task keeps only its result.
+        """
+        self.process = None
+        self.instance = None
+        self._pipe_conn = None
 
+    def reset(self) -> None:
+        """
+        Prepares dispatched task to be run again.
+        """
+        self.release()
+        self.duration = None
+        self.expired = False
+        self.measured = False
+        self.result.status = Status.NOTRUN
+
+    def dispose(self) -> None:
+        """
+        Joins finished process, frees its resources
+        and closes pipe before releasing them. Process
+        which does not exit in time is terminated.
+        """
+        self.process.join(EXIT_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.close()
+        self._pipe_conn.close()
+        self.release()
+
+    def crash(self) -> None:
+        """
+        Sets error result when process has died
+        without sending test result back.
+        """
+        self.result.status = Status.ERROR
+        self.result.duration = 0
+        self.result.usage = None
+        if self.duration is not None:
+            self.result.duration = round(
+                time.perf_counter() - self.duration, 2)
+
+    def set_result(self,
+                   response: Tuple[str, Status, float, int, tuple]
+                   ) -> None:
+        """
+        Sets result received from process to internal results object.
+
+        Args:
+            response (Tuple[str, Status, float, int, tuple]): Test name,
+            status, duration, number of runs and resource usage.
+        """
         (self.result.test_name,
          self.result.status,
          self.result.duration,
-         self.result.retries) = self._pipe_conn.recv()
+         self.result.retries,
+         usage) = response
+        self.result.usage = ResourceUsage(*usage) if usage else None
+        self.measured = True
+
+    @property
+    def connection(self) -> Pipe:
+        """
+        Getter for parent side of the pipe.
+
+        Returns:
+            Pipe: Pipe parent connection.
+        """
+        return self._pipe_conn
 
     def __repr__(self):
         return json.dumps(self.__dict__)
@@ -137,17 +301,40 @@ class Task(object):
 
 class Tasks(object):
     """
-    Wraps independent Task objects into list.
+    Wraps independent Task objects into list,
+    tasks are created lazily from pending tests.
     """
+    # Counter each test status is accounted to.
+    COUNTERS = {
+        Status.PASSED: 'passed',
+        Status.FAILED: 'failed',
+        Status.ERROR: 'error',
+        Status.TIMEOUT: 'error'
+    }
+
     def __init__(self) -> None:
-        self.remaining: List[Task] = []
+        # Dict keeps insertion order and allows O(1) removal.
+        self.remaining: Dict[Task, None] = {}
         self.completed: List[Task] = []
+        self.counters = dict.fromkeys(('passed', 'error', 'failed'), 0)
+        self.total: int = 0
+        self._pending: Iterator[TestMethod] = iter(())
+        self._parametrized: Optional[TestMethod] = None
+        self._cases: Iterator[TestMethod] = None
+        self.scopes = ScopeCounter()
+        self._requeued: Deque[Task] = deque()
+        self._deferred: List[Tuple[float, int, Task]] = []
+        self._deferred_count = itertools.count()
+        self.events = EventStream()
+        self.store: Optional[ResultStore] = None
+        self.rerun_policy: Optional[RerunPolicy] = None
 
     def add(self,
             process: S_Process,
             instance: TestCase,
-            pipe_conn: Pipe
-            ) -> None:
+            pipe_conn: Pipe,
+            test_method: TestMethod = None
+            ) -> Task:
         """
         Adds a process with its associated
         instance to the list, sets Result object.
@@ -156,20 +343,225 @@ class Tasks(object):
             process (S_Process): Process object.
             instance (TestCase): Test instance.
             pipe_conn: (Pipe): Pipe child connection.
+            test_method (TestMethod, optional): Test to be executed.
+
+        Returns:
+            Task: Added task.
+        """
+        task = Task(process, instance, pipe_conn, Result(), test_method)
+        self.remaining[task] = None
+        return task
+
+    def feed(self, test_methods: Iterable[TestMethod], total: int) -> None:
+        """
+        Sets tests that are turned into tasks on demand.
+
+        Args:
+            test_methods (Iterable[TestMethod]): Tests to be executed.
+            total (int): Number of tests.
+        """
+        self._pending = iter(test_methods)
+        self.total += total
+        self.events.publish('session', self.get_counters())
+
+    def next(self) -> Optional[Task]:
+        """
+        Returns requeued task, deferred rerun which is due
+        or creates task of the next pending test and adds
+        it to the remaining list, in this order.
+
+        Returns:
+            Task | None: Next task, None if none is available.
+        """
+        if self._requeued:
+            return self._requeued.popleft()
+
+        if (task := self.next_rerun()) is not None:
+            return task
+        return self._next_pending()
+
+    def next_rerun(self) -> Optional[Task]:
+        """
+        Returns:
+            Task | None: Deferred rerun whose delay has
+            passed, None if there is no such task.
+        """
+        if not self._deferred or self._deferred[0][0] > time.monotonic():
+            return None
+
+        task = heapq.heappop(self._deferred)[2]
+        self.remaining[task] = None
+        return task
+
+    def _next_pending(self) -> Optional[Task]:
+        """
+        Returns:
+            Task | None: Task of the next pending test or case
+            of parametrized test, None if there are none.
+        """
+        while True:
+            if self._cases is None:
+                if (test_method := next(self._pending, None)) is None:
+                    return None
+                if not test_method.parametrized:
+                    self.scopes.take(test_method)
+                    return self.add(None, None, None, test_method)
+                self._parametrized = test_method
+                self._cases = test_method.cases()
+
+            try:
+                test_method = next(self._cases, None)
+            except Exception:
+                # Test itself is run, so that it is reported as error.
+                print(format_exc())
+                test_method = self._parametrized
+            else:
+                if test_method is not None:
+                    self.total += 1
+                    return self.add(None, None, None, test_method)
+                # Parametrized test is replaced by its cases.
+                self.total -= 1
+
+            self.scopes.take(self._parametrized)
+            self._parametrized = self._cases = None
+            if test_method is not None:
+                return self.add(None, None, None, test_method)
+
+    def take(self, count: int) -> List[Task]:
+        """
+        Deferred reruns are not included, they are
+        meant to be run separately in a fresh process.
+
+        Args:
+            count (int): Maximum number of tasks.
+
+        Returns:
+            List[Task]: Up to count next requeued or pending tasks.
+        """
+        tasks = []
+        while len(tasks) < count:
+            if self._requeued:
+                tasks.append(self._requeued.popleft())
+            elif (task := self._next_pending()) is not None:
+                tasks.append(task)
+            else:
+                break
+        return tasks
+
+    def requeue(self, tasks: List[Task]) -> None:
+        """
+        Puts dispatched tasks which have not been executed
+        back in front of the pending ones.
+
+        Args:
+            tasks (List[Task]): Tasks to be run again.
+        """
+        for task in tasks:
+            task.reset()
+
+        self._requeued.extendleft(reversed(tasks))
+
+    def defer(self, task: Task, delay: float) -> None:
+        """
+        Removes finished task from the remaining list
+        and puts it on the queue to be run after delay.
+
+        Args:
+            task (Task): Failed task.
+            delay (float): Delay before rerun in seconds.
+        """
+        del self.remaining[task]
+        task.reset()
+        heapq.heappush(self._deferred, (time.monotonic() + delay,
+                                        next(self._deferred_count),
+                                        task))
+
+    def rerun_delay(self) -> Optional[float]:
+        """
+        Returns:
+            float | None: Seconds until the earliest deferred
+            rerun is due, None if there are no reruns.
+        """
+        if not self._deferred:
+            return None
+        return max(self._deferred[0][0] - time.monotonic(), 0)
+
+    @property
+    def running(self) -> int:
+        """
+        Returns:
+            int: Number of tasks being executed.
+        """
+        return sum(task.result.status is Status.RUNNING
+                   for task in self.remaining)
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns:
+            int: Number of tests not dispatched yet, including
+            deferred reruns, which are not remaining meanwhile.
+        """
+        return (self.total - len(self.completed) - len(self.remaining)
+                + len(self._requeued))
+
+    def start(self, task: Task) -> None:
+        """
+        Publishes start of task execution.
+
+        Args:
+            task (Task): Particular Task object.
         """
-        task = Task(process, instance, pipe_conn, Result())
-        self.remaining.append(task)
+        self.events.publish('start', {
+            "test_name": task.test_method.name,
+            "test_id": task.test_method.value
+        })
 
     def complete(self, task: Task) -> None:
         """
         Adds task to completed task list and
-        removes from the remaining.
+        removes from the remaining. Failed task is
+        deferred instead when rerun policy allows it.
 
         Args:
             task (Task): Particular Task object.
         """
+        task.runs = max(task.runs + 1, task.result.retries)
+        task.result.retries = task.runs
+
+        delay = None
+        if self.rerun_policy is not None:
+            delay = self.rerun_policy.delay(task.runs, task.result.status)
+
+        if delay is not None:
+            self.events.publish('rerun', {
+                **task.result.serialize(),
+                "delay": delay
+            })
+            self.defer(task, delay)
+            return
+
         self.completed.append(task)
-        self.remaining.remove(task)
+        del self.remaining[task]
+        # Arguments of many cases are not kept once they are done.
+        task.test_method.params = None
+
+        if (counter := Tasks.COUNTERS.get(task.result.status)) is not None:
+            self.counters[counter] += 1
+
+        self.events.publish('finish', {
+            **task.result.serialize(),
+            "seq": len(self.completed) - 1,
+            "progress": self.get_counters()
+        })
+
+        if self.store is not None:
+            finished = time.time()
+            started = None
+            if task.duration is not None:
+                started = finished - (time.perf_counter() - task.duration)
+            self.store.add_result(task.test_method, task.result,
+                                  task.worker, started, finished)
 
     def info(self) -> List[str]:
         """
@@ -181,41 +573,67 @@ class Tasks(object):
         output: List[str] = []
 
         for task in self.completed:
-            output.append(f"Test Name: {task.result.test_name} " +
-                          f"Result: {task.result.status} " +
-                          f"Duration: {task.result.duration} " +
-                          f"Retries: {task.result.retries}")
+            line = (f"Test Name: {task.result.test_name} " +
+                    f"Result: {task.result.status} " +
+                    f"Duration: {task.result.duration} " +
+                    f"Retries: {task.result.retries}")
+            if task.result.usage is not None:
+                line += f" {task.result.usage.describe()}"
+            output.append(line)
         return output
 
     def __iter__(self) -> list[Task]:
         return itertools.cycle(self.remaining)
 
-    def get_progress(self) -> None:
-        passed = error = failed = notrun = 0
+    def get_counters(self) -> dict:
+        """
+        Returns:
+            dict: Counters of test statuses including not run tests.
+        """
+        return {**self.counters, "notrun": self.total - len(self.completed)}
+
+    def get_progress(self, since: int = 0) -> dict:
+        """
+        Returns counters of test statuses along with results
+        completed since given sequence number. Client passes
+        the returned sequence back to get only new results.
+
+        Args:
+            since (int, optional): Sequence number of the first
+            result to be returned, defaults to all results.
+
+        Returns:
+            dict: Counters, sequence number and result records.
+        """
+        sequence = len(self.completed)
+        # Cursor from before reset, send everything again.
+        if not 0 <= since <= sequence:
+            since = 0
+
+        records = []
+        for seq in range(since, sequence):
+            record = self.completed[seq].result.serialize()
+            record["seq"] = seq
+            records.append(record)
 
-        for task in self.completed:
-            if task.result.status.name == 'PASSED':
-                passed += 1
-            if task.result.status.name == 'FAILED':
-                failed += 1
-            if task.result.status.name == 'ERROR':
-                error += 1
-            if task.result.status.name == 'TIMEOUT':
-                error += 1
-
-        notrun = len(self.remaining)
         progress = {
-            "passed": passed,
-            "error": error,
-            "failed": failed,
-            "notrun": notrun,
-            "list": jsons.dump(self.completed)
+            **self.get_counters(),
+            "sequence": sequence,
+            "list": records
         }
         return progress
 
     def reset(self) -> None:
         self.remaining.clear()
         self.completed.clear()
+        self.counters = dict.fromkeys(self.counters, 0)
+        self.total = 0
+        self._pending = iter(())
+        self._parametrized = self._cases = None
+        self.scopes = ScopeCounter()
+        self._requeued.clear()
+        self._deferred.clear()
+        self.events.publish('reset', self.get_counters())
 
 
 class Runner(object):
@@ -223,10 +641,58 @@ class Runner(object):
     Class responsible for creating processes in which
     each test is executed separately and independently.
     """
-    def __init__(self, decor: str = None) -> None:
+    def __init__(self,
+                 decor: str = None,
+                 mode: str = None,
+                 zygote: bool = None,
+                 batch_size: int = None,
+                 log_mode: str = None,
+                 rerun_policy: str = None,
+                 failed: str = None,
+                 coordinator: str = None,
+                 shard: Tuple[int, int] = None,
+                 adaptive: bool = None,
+                 profile: bool = None,
+                 durations: str = None
+                 ) -> None:
         """
         Initialization of processes list
         and generating tests' hierarchy.
+
+        Args:
+            decor (str, optional): Decorator name of tests to be run.
+            mode (str, optional): Execution mode, either "process"
+            (separate process per test), "pool" (long-lived workers)
+            or "distributed" (workers on other machines connect to
+            this runner). Defaults to EXECUTION_MODE env variable.
+            zygote (bool, optional): Fork processes from zygote which
+            has preloaded test modules. Defaults to ZYGOTE env variable.
+            batch_size (int, optional): Maximum number of tests sent to
+            pool worker at once, adapted to test durations. Defaults
+            to BATCH_SIZE env variable.
+            log_mode (str, optional): Either "direct" (each test process
+            writes its log files) or "central" (single log writer process).
+            Defaults to LOG_MODE env variable.
+            rerun_policy (str, optional): Either "immediate" (failed test
+            is rerun right away in the same process) or "deferred" (put
+            back on the queue and run later in a fresh process).
+            Defaults to RERUN_POLICY env variable.
+            failed (str, optional): Either "last" (run only tests which
+            have not passed last time) or "first" (run them first).
+            coordinator (str, optional): Address in "host:port" form
+            remote workers connect to in distributed mode. Defaults
+            to COORDINATOR env variable.
+            shard (Tuple[int, int], optional): Index, from 1, and number
+            of shards, only tests of this shard are executed.
+            adaptive (bool, optional): Adapt number of tests running at
+            the same time to system load. Defaults to ADAPTIVE_CONCURRENCY
+            env variable.
+            profile (bool, optional): Run tests under cProfile and write
+            profiles with aggregated report into session log folder.
+            Defaults to PROFILE env variable.
+            durations (str, optional): Durations file shards are balanced
+            by, the same for all shard jobs. Without it shards are split
+            by count.
         """
         set_cpu_count()
         load_env_file()
@@ -234,6 +700,38 @@ class Runner(object):
         self.test_tree: List[TestMethod] = create_tree(decor)
         self.selected: List[TestMethod] = []
         self.decor = decor
+        self.mode = mode or os.getenv('EXECUTION_MODE', 'process')
+        self.session_time: str = None
+        self._semaphore: Semaphore = None
+        self._context: BaseContext = None
+
+        if zygote is None:
+            zygote = os.getenv('ZYGOTE') == 'True'
+        self.zygote = zygote
+        self.batch_size = batch_size or int(os.getenv('BATCH_SIZE', 1))
+        self.log_mode = log_mode or os.getenv('LOG_MODE', 'direct')
+        self.log_address: Address = None
+        self.rerun_policy = (rerun_policy or
+                             os.getenv('RERUN_POLICY', 'immediate'))
+        self.failed = failed
+        self.coordinator = (coordinator or
+                            os.getenv('COORDINATOR', '127.0.0.1:8800'))
+        self.shard = shard
+        self.durations = durations
+        # Identifies whole set of tests split into shards.
+        self.split: Dict[str, object] = None
+
+        if adaptive is None:
+            adaptive = os.getenv('ADAPTIVE_CONCURRENCY') == 'True'
+        self.adaptive = adaptive
+        self._controller: ConcurrencyController = None
+
+        if profile is None:
+            profile = os.getenv('PROFILE') == 'True'
+        self.profile = profile
+
+        if os.getenv('RESULT_STORE', 'True') == 'True':
+            self.tasks.store = ResultStore()
 
     def collect_tests(self, list) -> None:
         """
@@ -244,6 +742,36 @@ class Runner(object):
             if elem.value in list:
                 self.selected.append(elem)
 
+    def collect_impacted(self,
+                         changed_files: Iterable[str] = None,
+                         base: str = 'HEAD'
+                         ) -> List[TestMethod]:
+        """
+        Selects tests of modules which import any of changed
+        files, directly or transitively. Only Python files
+        are taken into account, dynamic imports are not.
+
+        Args:
+            changed_files (Iterable[str], optional): Changed file paths,
+            defaults to git diff of the working tree.
+            base (str, optional): Git revision to compare to.
+
+        Returns:
+            List[TestMethod]: Selected tests, all tests are
+            executed when nothing is selected.
+        """
+        if changed_files is None:
+            changed_files = get_changed_files(base)
+
+        changed = {get_module_name(os.path.relpath(os.path.abspath(path),
+                                                   ROOT_DIR))
+                   for path in changed_files if path.endswith('.py')}
+        impacted = ImportGraph().impacted(changed)
+
+        self.selected = [test for test in self.test_tree
+                         if test.module_path in impacted]
+        return self.selected
+
     def importer(self, module_path: str) -> Module:
         """
         Imports given module name.
@@ -268,21 +796,76 @@ class Runner(object):
 
         return module
 
-    def dispatch_tasks(self) -> None:
+    def get_concurrency(self) -> int:
         """
-        Creates independent processes and appends
-        them into the pool of processes.
+        Returns:
+            int: Number of tests allowed to run at the same time,
+            one less than number of cores if CONCURRENCY is not set.
         """
-        start_time = get_time()
-        concurrency = int(os.getenv('CONCURRENCY'))
-        NO_SYSTEM_CPU = int(os.getenv('CPU_COUNT'))
+        concurrency = os.getenv('CONCURRENCY', 'NULL')
+        if concurrency == 'NULL':
+            NO_SYSTEM_CPU = int(os.getenv('CPU_COUNT'))
+            return max(NO_SYSTEM_CPU - 1, 1)
 
-        if concurrency is None:
-            concurrency = max(NO_SYSTEM_CPU - 1, 1)
-            if concurrency == 1:
-                raise ValueError('Not enough cores to parallelise.')
+        return max(int(concurrency), 1)
 
-        semaphore = Semaphore(concurrency)
+    def get_controller(self) -> Optional[ConcurrencyController]:
+        """
+        Returns:
+            ConcurrencyController | None: Controller bounded by
+            MIN_CONCURRENCY and MAX_CONCURRENCY, starting from
+            CONCURRENCY, None when concurrency is not adaptive
+            or tests run on remote workers.
+        """
+        if not self.adaptive or self.mode == 'distributed':
+            return None
+
+        maximum = os.getenv('MAX_CONCURRENCY', 'NULL')
+        if maximum == 'NULL':
+            maximum = os.getenv('CPU_COUNT')
+        return ConcurrencyController(int(os.getenv('MIN_CONCURRENCY', 1)),
+                                     int(maximum),
+                                     self.get_concurrency())
+
+    def get_limit(self, running: int) -> int:
+        """
+        Args:
+            running (int): Number of tests running now.
+
+        Returns:
+            int: Number of tests allowed to run at the same time.
+        """
+        if self._controller is None:
+            return self.get_concurrency()
+        return self._controller.update(running)
+
+    def get_wait_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        """
+        Shortens waiting for results, so that adaptive
+        concurrency follows system load between them.
+
+        Args:
+            timeout (float | None): Maximum waiting time in seconds.
+
+        Returns:
+            float | None: Adjusted waiting time.
+        """
+        if self._controller is None:
+            return timeout
+        if timeout is None:
+            return ConcurrencyController.INTERVAL
+        return min(timeout, ConcurrencyController.INTERVAL)
+
+    def dispatch_tasks(self) -> None:
+        """
+        Selects tests to be executed and feeds them to
+        the tasks. Processes are created lazily when
+        running tests, at most CONCURRENCY + PREFETCH
+        of them exist at the same time. With adaptive
+        concurrency the semaphore allows up to maximum
+        tests and controller holds permits above limit.
+        """
+        self.session_time = get_time()
 
         if self.decor:
             for test_method in self.test_tree:
@@ -291,95 +874,377 @@ class Runner(object):
 
         if not self.selected:
             self.selected = self.test_tree
+        if self.shard is not None:
+            self.split = {"total": len(self.selected),
+                          "digest": split_digest(
+                              test.key for test in self.selected)}
+            history = None
+            if self.durations is not None:
+                history = DurationHistory(path=self.durations)
+            self.selected = select_shard(self.selected, *self.shard, history)
+
+        self._context = multiprocess.get_context()
+        if self.zygote:
+            self._context = get_context(
+                test.module_path for test in self.selected)
+
+        self._controller = self.get_controller()
+        if self._controller is None:
+            self._semaphore = self._context.Semaphore(self.get_concurrency())
+        else:
+            self._semaphore = self._context.Semaphore(
+                self._controller.maximum)
+            self._controller.attach(self._semaphore)
+
+        scheduled = self.selected
+        if os.getenv('SCHEDULING') == 'duration':
+            scheduled = longest_first(self.selected, DurationHistory())
+        if self.failed:
+            scheduled = self.select_failed(scheduled)
+
+        self.tasks.feed(iter(scheduled), len(scheduled))
+        self.tasks.scopes.add(scheduled)
+        self.tasks.rerun_policy = self.get_rerun_policy()
+        if self.tasks.store is not None and scheduled:
+            self.tasks.store.begin_session(
+                self.session_time, self.mode, len(scheduled))
+
+    def select_failed(self, tests: List[TestMethod]) -> List[TestMethod]:
+        """
+        Uses last recorded status of each test to either keep
+        only tests which have not passed or move them to the
+        front of the queue. All tests are kept when there
+        are no such tests.
 
-        for test_method in self.selected:
+        Args:
+            tests (List[TestMethod]): Scheduled tests.
+
+        Returns:
+            List[TestMethod]: Tests to be executed in order.
+        """
+        if self.tasks.store is None:
+            return tests
 
-            module = self.importer(test_method.module_path)
+        # Parametrized test is selected by any of its failed cases.
+        failed = {key.partition('[')[0]
+                  for key in self.tasks.store.failed_tests()}
+        if self.failed == 'last':
+            return [test for test in tests if test.key in failed] or tests
+        return sorted(tests, key=lambda test: test.key not in failed)
 
-            _class = getattr(module, test_method.test_class)
-            _test_instance = _class(test_method.test_name)
-            parent_conn, child_conn = Pipe()
+    def get_rerun_policy(self) -> Optional[RerunPolicy]:
+        """
+        Returns:
+            RerunPolicy | None: Policy of deferred reruns with
+            fresh session budget, None for immediate reruns.
+        """
+        if self.rerun_policy != 'deferred':
+            return None
 
-            process = S_Process(
-                target=getattr(_class, test_method.test_name),
-                args=(_test_instance,),
-                test_name=test_method.test_name,
-                session_time=start_time,
-                semaphore=semaphore,
-                pipe_conn=child_conn
-            )
-            self.tasks.add(process, _test_instance, parent_conn)
+        budget = os.getenv('RERUN_BUDGET', 'NULL')
+        return RerunPolicy(int(os.getenv('MAX_RERUNS')),
+                           float(os.getenv('RERUN_BACKOFF', 0)),
+                           None if budget == 'NULL' else int(budget))
 
-    def run_tests(self) -> None:
+    def get_max_runs(self) -> Optional[int]:
         """
-        Runs all tests and gathers results.
+        Returns:
+            int | None: Number of runs of a test in one process,
+            None for MAX_RERUNS.
         """
-        def runner(tasks: List[Task]):
-            """
-            Helper method to run tasks in
-            separate non-blocking Thread.
+        return 1 if self.rerun_policy == 'deferred' else None
 
-            Args:
-                tasks (List[Task]): List of tasks.
-            """
-            try:
-                for task in tasks:
-                    # log.debug(f'Running task: {task}.')
-                    task.run()
+    def spawn(self, task: Task) -> None:
+        """
+        Imports test module, creates test instance,
+        pipe and process of the task right before it runs.
 
-            except Exception:
-                print(traceback.format_exc())
-            # log.info('Runned all available tasks.')
+        Args:
+            task (Task): Task without process.
+        """
+        test_method = task.test_method
+        module = self.importer(test_method.module_path)
+
+        _class = getattr(module, test_method.test_class)
+        _test_instance = _class(test_method.test_name)
+        parent_conn, child_conn = Pipe()
+
+        process = S_Process(
+            target=getattr(_class, test_method.test_name),
+            args=(_test_instance,),
+            kwargs=test_method.params or {},
+            test_name=test_method.name,
+            session_time=self.session_time,
+            semaphore=self._semaphore,
+            pipe_conn=child_conn,
+            log_address=self.log_address,
+            max_runs=self.get_max_runs(),
+            first_run=task.runs + 1,
+            profile=self.profile,
+            test_class=_class
+        )
+        bind(process, self._context)
+        task.attach(process, _test_instance, parent_conn)
 
-        TIMEOUT = int(os.getenv('PROCESS_TIMEOUT'))
+    def run_tests(self) -> None:
+        """
+        Runs all tests and gathers results. Durations
+        of completed tests are recorded for scheduling.
+        In central log mode test processes send their
+        records to log writer started for the session,
+        so do remote workers in distributed mode. Profiled
+        session ends with aggregated profile report.
+        """
+        writer = None
+        if self.log_mode == 'central' or self.mode == 'distributed':
+            writer = LogWriter(self.session_time)
+            writer.start()
+            self.log_address = writer.address
 
         try:
-            runner = Thread(target=runner, args=(self.tasks.remaining.copy(),))
-            runner.start()
+            if self.mode in ('pool', 'distributed'):
+                self.run_pool()
+            else:
+                self.run_processes()
+        finally:
+            if writer is not None:
+                writer.stop()
+                self.log_address = None
+            if self.tasks.store is not None:
+                self.tasks.store.finish_session(self.tasks.counters)
+
+        self.save_durations()
+        if self.profile:
+            self.save_profile_report()
+
+    def save_profile_report(self) -> str:
+        """
+        Aggregates profiles of session tests into report
+        placed next to them in session log folder.
 
-        except (KeyboardInterrupt, SystemExit):
-            for task in self.tasks.remaining:
-                if task.process.is_alive():
-                    task.terminate(0)
+        Returns:
+            str: Report file path.
+        """
+        folder_path = os.path.join('logs', f'test_session_{self.session_time}')
+        path = ProfileReport(folder_path).write()
+        print(f'Profile report: {path}')
+        return path
 
-        try:
-            if not self.tasks.remaining:
-                raise IndexError('No tasks were found in remaining list.')
+    def save_durations(self) -> None:
+        """
+        Records durations of completed tests into history,
+        tests which crashed or timed out keep previous average.
+        """
+        history = DurationHistory()
+        history.record_session(
+            (task.test_method,
+             task.result.duration if task.measured else None)
+            for task in self.tasks.completed)
+        history.save()
+
+    def get_timeout(self, task: Task) -> float:
+        """
+        Args:
+            task (Task): Particular task.
 
-            while self.tasks.remaining:
-                for task in self.tasks.remaining.copy():
+        Returns:
+            float: Timeout declared on the test,
+            PROCESS_TIMEOUT if there is none.
+        """
+        if task.test_method.timeout is not None:
+            return task.test_method.timeout
+        return int(os.getenv('PROCESS_TIMEOUT'))
 
-                    if (not task.process.is_alive()
-                       and task.result.status.name == 'RUNNING'):
-                        # log.debug('Joining task: ', task)
-                        task.join()
-                        self.tasks.complete(task)
+    def run_processes(self) -> None:
+        """
+        Runs all tests each in separate process
+        and gathers results.
+        """
+        PREFETCH = int(os.getenv('PREFETCH', 2))
+        watchdog = Watchdog(Task.expire)
+        waiting: Dict[object, Task] = {}
+        finished: List[Task] = []
 
-                    elif task.result.status.name == "RUNNING":
-                        check_time = time.perf_counter() - task.duration
+        def complete(task: Task) -> None:
+            waiting.pop(task.connection, None)
+            waiting.pop(task.process.sentinel, None)
+            finished.append(task)
 
-                        if (check_time > TIMEOUT):
-                            # log.debug('Terminating task: ', task)
-                            task.terminate(TIMEOUT)
-                            self.tasks.complete(task)
+        try:
+            if not self.tasks.total:
+                raise IndexError('No tasks were found in remaining list.')
 
-                time.sleep(0.2)
+            watchdog.start()
+
+            while True:
+                LIMIT = self.get_limit(self.tasks.running) + PREFETCH
+
+                while (len(self.tasks.remaining) < LIMIT
+                       and (task := self.tasks.next()) is not None):
+                    self.spawn(task)
+                    task.run()
+                    waiting[task.connection] = task
+                    waiting[task.process.sentinel] = task
+
+                # Wake up for deferred rerun only when it can be started.
+                timeout = None
+                if len(self.tasks.remaining) < LIMIT:
+                    timeout = self.tasks.rerun_delay()
+
+                if not waiting:
+                    if timeout is None:
+                        break
+                    time.sleep(timeout)
+                    continue
+
+                ready_list = wait(list(waiting),
+                                  self.get_wait_timeout(timeout))
+
+                with watchdog.lock:
+                    for ready in ready_list:
+                        if (task := waiting.get(ready)) is None:
+                            continue
+
+                        try:
+                            if ready is task.process.sentinel:
+                                if not task.connection.poll():
+                                    raise EOFError
+                            if not task.receive():
+                                watchdog.watch(task, self.get_timeout(task))
+                                self.tasks.start(task)
+                                continue
+
+                        except EOFError:
+                            # log.debug('Process died: ', task)
+                            if task.expired:
+                                task.set_timeout()
+                            else:
+                                task.crash()
+
+                        complete(task)
+
+                # Joined without the lock, so that process which
+                # does not exit cannot hold the watchdog.
+                for task in finished:
+                    task.dispose()
+                    self.tasks.complete(task)
+                finished.clear()
 
         except (KeyboardInterrupt, SystemExit):
             # log.debug('Parent received CTRL-C: stopping all processes.')
             for task in self.tasks.remaining:
                 if task.process.is_alive():
-                    task.terminate(0)
+                    task.terminate()
 
         except Exception:
             raise Exception('Some error occurred during test exec.')
 
+        finally:
+            watchdog.stop()
+
+    def run_pool(self) -> None:
+        """
+        Runs all tests on fixed pool of long-lived workers
+        and gathers results. Tests are sent in batches when
+        batch size allows it. Worker of timed out test is
+        terminated by watchdog and replaced with a new one,
+        the rest of its batch is put back in the queue.
+        In distributed mode the pool consists of remote
+        workers, which may join at any time.
+        """
+        if not self.tasks.total:
+            raise IndexError('No tasks were found in remaining list.')
+
+        # Pool tells which task its worker is killed for.
+        watchdog = Watchdog(lambda task: pool.kill(task))
+
+        def start(task: Task) -> None:
+            watchdog.watch(task, self.get_timeout(task))
+            self.tasks.start(task)
+
+        if self.mode == 'distributed':
+            pool = RemotePool(parse_address(self.coordinator),
+                              self.session_time, on_start=start,
+                              log_address=self.log_address,
+                              max_runs=self.get_max_runs(),
+                              profile=self.profile)
+        else:
+            tests = {test.value: test for test in self.selected}
+            size = self.get_concurrency()
+            if self._controller is not None:
+                size = self._controller.maximum
+            size = min(size, self.tasks.total)
+            pool = WorkerPool(size, tests, self.session_time, self._context,
+                              on_start=start, log_address=self.log_address,
+                              max_runs=self.get_max_runs(),
+                              profile=self.profile)
+
+        try:
+            watchdog.start()
+            pool.start(self.batch_size)
+
+            while True:
+                while (conn := pool.idle()) is not None:
+                    # Workers above adaptive limit are kept idle.
+                    if (self._controller is not None and len(pool.busy)
+                       >= self._controller.update(len(pool.busy))):
+                        conn = None
+                        break
+
+                    # Deferred rerun goes alone to a fresh worker.
+                    if (task := self.tasks.next_rerun()) is not None:
+                        pool.submit(pool.renew(conn), [task])
+                        continue
+
+                    count = pool.batch_size(self.tasks.pending)
+                    if not (batch := self.tasks.take(count)):
+                        break
+                    pool.submit(conn, batch)
+                    # Sent after the batch, so its scopes outlive it.
+                    if scopes := self.tasks.scopes.exhausted():
+                        pool.release(scopes)
+
+                # Wake up for deferred rerun only when a worker is idle.
+                timeout = None
+                if conn is not None:
+                    timeout = self.tasks.rerun_delay()
+
+                if not self.tasks.remaining and not self.tasks.pending:
+                    break
+
+                ready_list = pool.wait(self.get_wait_timeout(timeout))
+
+                with watchdog.lock:
+                    for task, response in pool.collect(ready_list):
+                        if response is not None:
+                            task.set_result(response)
+                        elif task.expired:
+                            task.set_timeout()
+                        else:
+                            task.crash()
+                        task.release()
+                        self.tasks.complete(task)
+
+                    if pool.orphaned:
+                        self.tasks.requeue(pool.orphaned)
+                        pool.orphaned = []
+
+        except (KeyboardInterrupt, SystemExit):
+            pass
+
+        finally:
+            watchdog.stop()
+            pool.close()
+
     def pause_resume(self) -> None:
         """
         Pauses or resumes test execution.
         """
         for task in self.tasks.remaining:
             # if task.process.is_alive():
+            if task.process is None or isinstance(task.process,
+                                                  RemoteWorker):
+                continue
             proc = psutil.Process(task.process.pid)
             print('jestem w funkcji:', proc.status())
 
@@ -396,6 +1261,28 @@ class Runner(object):
         """
         pprint.pprint(self.tasks.info())
 
+    def get_report(self) -> dict:
+        """
+        Returns:
+            dict: JSON serializable report of the session,
+            shard reports can be merged into one. Report of
+            shard lists its tests and identifies the split.
+        """
+        results = []
+        for task in self.tasks.completed:
+            result = task.result.serialize()
+            result["test_key"] = task.test_method.key
+            results.append(result)
+
+        return {
+            "session_time": self.session_time,
+            "shard": self.shard,
+            "split": self.split,
+            "tests": self.shard and [test.key for test in self.selected],
+            "counters": self.tasks.get_counters(),
+            "results": results
+        }
+
 
 def main():
     runner = Runner()
@@ -409,13 +1296,64 @@ def argsparser():
 
     parser = argparse.ArgumentParser()
     parser.add_argument('-d', metavar='DECORATOR', type=str, default=None)
+    parser.add_argument('-m', metavar='MODE', type=str, default=None,
+                        choices=['process', 'pool', 'distributed'])
+    parser.add_argument('-z', action='store_true', default=None,
+                        help='fork test processes from zygote')
+    parser.add_argument('-b', metavar='BATCH_SIZE', type=int, default=None,
+                        help='maximum number of tests per worker message')
+    parser.add_argument('-l', metavar='LOG_MODE', type=str, default=None,
+                        choices=['direct', 'central'],
+                        help='write logs from test processes or log writer')
+    parser.add_argument('-r', metavar='RERUN_POLICY', type=str, default=None,
+                        choices=['immediate', 'deferred'],
+                        help='rerun failed tests right away or later')
+    failed = parser.add_mutually_exclusive_group()
+    failed.add_argument('--lf', '--last-failed', dest='failed',
+                        action='store_const', const='last',
+                        help='run only tests which failed last time')
+    failed.add_argument('--ff', '--failed-first', dest='failed',
+                        action='store_const', const='first',
+                        help='run tests which failed last time first')
+
+    parser.add_argument('--changed', metavar='FILE', nargs='*', default=None,
+                        help='run only tests impacted by changed files, '
+                             'git diff of working tree if none given')
+    parser.add_argument('--base', metavar='REF', default='HEAD',
+                        help='git revision changed files are compared to')
+    parser.add_argument('--listen', metavar='HOST:PORT', default=None,
+                        help='address remote workers connect to '
+                             'in distributed mode')
+    parser.add_argument('--shard', metavar='INDEX/TOTAL', type=parse_shard,
+                        default=None,
+                        help='run only given shard of tests, index from 1')
+    parser.add_argument('--durations', metavar='FILE', default=None,
+                        help='durations file shards are balanced by, '
+                             'split by count without it')
+    parser.add_argument('--report', metavar='FILE', default=None,
+                        help='write session report as JSON file')
+    parser.add_argument('-a', '--adaptive', action='store_true', default=None,
+                        help='adapt number of running tests to system load')
+    parser.add_argument('--profile', action='store_true', default=None,
+                        help='profile tests and report hot spots')
 
     args = parser.parse_args()
 
-    runner = Runner(args.d)
+    runner = Runner(args.d, args.m, args.z, args.b, args.l, args.r,
+                    args.failed, args.listen, args.shard, args.adaptive,
+                    args.profile, args.durations)
+    if args.changed is not None:
+        if not runner.collect_impacted(args.changed or None, args.base):
+            print('No tests are impacted by the changes.')
+            return
     runner.dispatch_tasks()
-    runner.run_tests()
-    runner.get_results()
+    if runner.tasks.total:
+        runner.run_tests()
+        runner.get_results()
+    else:
+        print('No tests were selected.')
+    if args.report is not None:
+        save_report(runner.get_report(), args.report)
 
 if __name__ == "__main__":
     # main()
@@ -0,0 +1,290 @@
+import os
+import json
+import heapq
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from eightest.searcher import TestMethod
+from eightest.testcase import Status
+from eightest.utilities import CACHE_DIR
+
+# Estimated cost of running any test in seconds, so that
+# tests without known duration still spread across shards.
+SHARD_OVERHEAD = 0.05
+
+
+class DurationHistory(object):
+    """
+    Local store of test durations from previous sessions.
+    Keeps exponential moving average of duration per test,
+    parametrized test is kept as total of all its cases,
+    so that it weighs as much as its cases together.
+    """
+    # Weight of the latest duration in the average.
+    SMOOTHING = 0.5
+
+    def __init__(self,
+                 cache_dir: str = CACHE_DIR,
+                 path: str = None
+                 ) -> None:
+        """
+        Args:
+            cache_dir (str, optional): Cache folder path.
+            path (str, optional): Durations file used instead
+            of the one in cache folder.
+        """
+        self.path = path or os.path.join(cache_dir, 'durations.json')
+        self.durations: Dict[str, float] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads durations from disk, missing or
+        corrupted file results in empty history.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                self.durations = json.load(file)
+        except (OSError, ValueError):
+            self.durations = {}
+
+    def save(self) -> None:
+        """
+        Writes durations to disk.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.durations, file)
+
+        os.replace(temp_path, self.path)
+
+    def record(self, test_method: TestMethod, duration: float) -> None:
+        """
+        Updates average duration of given test.
+
+        Args:
+            test_method (TestMethod): Executed test.
+            duration (float): Test execution duration.
+        """
+        key = test_method.method_key
+        if (previous := self.durations.get(key)) is not None:
+            duration = (DurationHistory.SMOOTHING * duration +
+                        (1 - DurationHistory.SMOOTHING) * previous)
+        self.durations[key] = round(duration, 4)
+
+    def record_session(self,
+                       durations: Iterable[Tuple[TestMethod,
+                                                 Optional[float]]]
+                       ) -> None:
+        """
+        Updates averages with durations of a session,
+        durations of cases are summed up per test method.
+        Method with any case lacking duration is not updated,
+        as its total would be underestimated.
+
+        Args:
+            durations (Iterable[Tuple[TestMethod, Optional[float]]]):
+            Executed tests along with their durations.
+        """
+        totals: Dict[str, Tuple[TestMethod, Optional[float]]] = {}
+        for test_method, duration in durations:
+            key = test_method.method_key
+            _, total = totals.get(key, (test_method, 0.0))
+            if total is not None and duration is not None:
+                totals[key] = (test_method, total + duration)
+            else:
+                totals[key] = (test_method, None)
+
+        for test_method, duration in totals.values():
+            if duration is not None:
+                self.record(test_method, duration)
+
+    def get(self, test_method: TestMethod) -> Optional[float]:
+        """
+        Args:
+            test_method (TestMethod): Particular test.
+
+        Returns:
+            float | None: Average duration, None if test never run.
+        """
+        return self.durations.get(test_method.method_key)
+
+
+class Estimator(object):
+    """
+    Estimates test durations from history. Tests which
+    have never run get average of their class, module
+    or all known tests, whichever is found first.
+    """
+    def __init__(self,
+                 history: DurationHistory,
+                 tests: Iterable[TestMethod]
+                 ) -> None:
+        """
+        Args:
+            history (DurationHistory): Durations of previous runs.
+            tests (Iterable[TestMethod]): Tests to be estimated.
+        """
+        self._history = history
+        self._averages: Dict[str, List[float]] = {}
+
+        for test_method in tests:
+            if (duration := history.get(test_method)) is None:
+                continue
+            for key in self._group_keys(test_method):
+                total = self._averages.setdefault(key, [0.0, 0])
+                total[0] += duration
+                total[1] += 1
+
+    def estimate(self, test_method: TestMethod) -> float:
+        """
+        Args:
+            test_method (TestMethod): Particular test.
+
+        Returns:
+            float: Estimated duration, 0 when nothing is known.
+        """
+        if (duration := self._history.get(test_method)) is not None:
+            return duration
+
+        for key in self._group_keys(test_method):
+            if (total := self._averages.get(key)) is not None:
+                return total[0] / total[1]
+        return 0.0
+
+    @staticmethod
+    def _group_keys(test_method: TestMethod) -> List[str]:
+        """
+        Returns:
+            List[str]: Class, module and global group keys.
+        """
+        return [f'{test_method.module_path}.{test_method.test_class}',
+                test_method.module_path,
+                '']
+
+
+def longest_first(tests: List[TestMethod],
+                  history: DurationHistory
+                  ) -> List[TestMethod]:
+    """
+    Orders tests by estimated duration, longest first,
+    so that slow tests do not end up at the tail of
+    the session. Ties keep discovery order.
+
+    Args:
+        tests (List[TestMethod]): Tests to be scheduled.
+        history (DurationHistory): Durations of previous runs.
+
+    Returns:
+        List[TestMethod]: Ordered tests.
+    """
+    estimator = Estimator(history, tests)
+    return sorted(tests, key=estimator.estimate, reverse=True)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Args:
+        value (str): Shard in "INDEX/TOTAL" form, index from 1.
+
+    Raises:
+        ValueError: When value is malformed or index is out of range.
+
+    Returns:
+        Tuple[int, int]: Shard index and number of shards.
+    """
+    index, _, total = value.partition('/')
+    index, total = int(index), int(total)
+    if not 1 <= index <= total:
+        raise ValueError(f'Shard index out of range: {value}')
+    return index, total
+
+
+def select_shard(tests: List[TestMethod],
+                 index: int,
+                 total: int,
+                 history: Optional[DurationHistory] = None
+                 ) -> List[TestMethod]:
+    """
+    Splits tests into shards of roughly equal estimated
+    duration and returns the one with given index. Longest
+    tests are assigned first, each to the least loaded shard.
+    Split depends only on tests and given history, so jobs
+    given the same durations file select disjoint shards on
+    any machine. Without history tests are split evenly by
+    count in order of their keys.
+
+    Args:
+        tests (List[TestMethod]): Tests to be split.
+        index (int): Shard index, from 1.
+        total (int): Number of shards.
+        history (DurationHistory, optional): Durations shared
+        by all shard jobs.
+
+    Returns:
+        List[TestMethod]: Tests of the shard in their original order.
+    """
+    if history is None:
+        weights = dict.fromkeys((test.key for test in tests), SHARD_OVERHEAD)
+    else:
+        estimator = Estimator(history, tests)
+        weights = {test.key: estimator.estimate(test) + SHARD_OVERHEAD
+                   for test in tests}
+    loads = [(0.0, number) for number in range(1, total + 1)]
+    selected = set()
+
+    for key in sorted(weights, key=lambda key: (-weights[key], key)):
+        load, number = heapq.heappop(loads)
+        if number == index:
+            selected.add(key)
+        heapq.heappush(loads, (load + weights[key], number))
+
+    return [test for test in tests if test.key in selected]
+
+
+class RerunPolicy(object):
+    """
+    Decides whether failed test is put back on the queue
+    to be run later in a fresh process. Delay before rerun
+    doubles with each run, session budget limits total
+    number of reruns.
+    """
+    # Statuses of tests which are rerun.
+    STATUSES = (Status.FAILED, Status.ERROR)
+
+    def __init__(self,
+                 max_runs: int,
+                 backoff: float = 0,
+                 budget: Optional[int] = None
+                 ) -> None:
+        """
+        Args:
+            max_runs (int): Maximum number of runs of a test.
+            backoff (float, optional): Delay before the first rerun.
+            budget (int | None, optional): Maximum number of reruns
+            in the session, unlimited if None.
+        """
+        self.max_runs = max_runs
+        self.backoff = backoff
+        self.budget = budget
+
+    def delay(self, runs: int, status: Status) -> Optional[float]:
+        """
+        Consumes budget when test is to be rerun.
+
+        Args:
+            runs (int): Number of runs so far.
+            status (Status): Status of the last run.
+
+        Returns:
+            float | None: Delay before rerun in seconds,
+            None if test is not rerun.
+        """
+        if (status not in RerunPolicy.STATUSES or runs >= self.max_runs
+           or self.budget == 0):
+            return None
+
+        if self.budget is not None:
+            self.budget -= 1
+        return self.backoff * 2 ** (runs - 1)
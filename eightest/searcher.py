@@ -1,11 +1,21 @@
 import os
 import ast
+import importlib
+import subprocess
+import multiprocess
 
-from typing import Tuple
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+from eightest.cache import DiscoveryCache
 from eightest.utilities import ROOT_DIR
 from eightest.exceptions import (NoTestsFoundError,
                                  TestOutOfClassError)
 
+# Minimal number of modules to be parsed in parallel.
+PARALLEL_SCAN_MIN = 64
+# Folders never searched for project modules.
+EXCLUDED_DIRS = {'__pycache__', 'venv', 'node_modules', 'logs'}
+
 
 class TestMethod(object):
 
@@ -14,14 +24,68 @@ class TestMethod(object):
                  test_class: str,
                  test_name: str,
                  value: int,
-                 decorator: str = None
+                 decorator: str = None,
+                 timeout: float = None,
+                 parametrized: bool = False
                  ) -> None:
         self.module_path = module_path
         self.test_class = test_class
         self.test_name = test_name
         self.decorator = decorator
+        self.timeout = timeout
+        self.parametrized = parametrized
         self.selected = None
         self.value = value
+        # Index and arguments of a case of parametrized test.
+        self.case: int = None
+        self.params: dict = None
+
+    @property
+    def name(self) -> str:
+        """
+        Returns:
+            str: Test name, followed by index of the case
+            for case of parametrized test.
+        """
+        if self.case is None:
+            return self.test_name
+        return f'{self.test_name}[{self.case}]'
+
+    @property
+    def key(self) -> str:
+        """
+        Returns:
+            str: Identifier of test stable between sessions.
+        """
+        return f'{self.module_path}.{self.test_class}.{self.name}'
+
+    @property
+    def method_key(self) -> str:
+        """
+        Returns:
+            str: Identifier of test method, shared by
+            all cases of parametrized test.
+        """
+        return f'{self.module_path}.{self.test_class}.{self.test_name}'
+
+    def cases(self) -> Iterator['TestMethod']:
+        """
+        Generates cases of parametrized test one by one,
+        test module is imported in the current process.
+
+        Yields:
+            TestMethod: Next case with its arguments.
+        """
+        module = importlib.import_module(self.module_path)
+        target = getattr(getattr(module, self.test_class), self.test_name)
+
+        for case, params in enumerate(target.parameters.cases()):
+            test_method = TestMethod(self.module_path, self.test_class,
+                                     self.test_name, f'{self.value}[{case}]',
+                                     self.decorator, self.timeout)
+            test_method.case = case
+            test_method.params = params
+            yield test_method
 
 
 def infinite_sequence():
@@ -59,8 +123,10 @@ def get_test_modules() -> list[str]:
     """
     test_files = []
 
-    for root, _, files in os.walk(find_folder_path()):
-        for file_name in files:
+    for root, dirs, files in os.walk(find_folder_path()):
+        # Keep discovery order, and so test IDs, stable.
+        dirs.sort()
+        for file_name in sorted(files):
 
             # Ignore cache files
             if file_name.endswith('.pyc'):
@@ -111,43 +177,338 @@ def read_from_module(module: str) -> Tuple[ast.FunctionDef, ast.ClassDef]:
     return functions, classes
 
 
-def create_tree(decor: str) -> list[dict]:
+def get_timeout(node: ast.AST) -> float | None:
+    """
+    Reads timeout declared on test method with timeout
+    decorator or on test class with TIMEOUT attribute.
+    Only number literals are recognized.
+
+    Args:
+        node (ast.AST): Method or class definition.
+
+    Returns:
+        float | None: Declared timeout in seconds.
+    """
+    values = []
+
+    if isinstance(node, ast.FunctionDef):
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call) or not decorator.args:
+                continue
+            func = decorator.func
+            name = getattr(func, 'id', None) or getattr(func, 'attr', None)
+            if name == 'timeout':
+                values.append(decorator.args[0])
+
+    if isinstance(node, ast.ClassDef):
+        for item in node.body:
+            if isinstance(item, ast.Assign):
+                targets = item.targets
+            elif isinstance(item, ast.AnnAssign):
+                targets = [item.target]
+            else:
+                continue
+            if any(getattr(t, 'id', None) == 'TIMEOUT' for t in targets):
+                values.append(item.value)
+
+    for value in values:
+        if (isinstance(value, ast.Constant)
+           and isinstance(value.value, (int, float))):
+            return value.value
+    return None
+
+
+def is_parametrized(node: ast.FunctionDef) -> bool:
+    """
+    Args:
+        node (ast.FunctionDef): Method definition.
+
+    Returns:
+        bool: Whether method is decorated with parametrize.
+    """
+    for decorator in node.decorator_list:
+        if not isinstance(decorator, ast.Call):
+            continue
+        func = decorator.func
+        name = getattr(func, 'id', None) or getattr(func, 'attr', None)
+        if name == 'parametrize':
+            return True
+    return False
+
+
+def scan_module(module: str) -> dict:
+    """
+    Parses module and picks out its test functions.
+
+    Args:
+        module (str): Module path relative to root folder.
+
+    Returns:
+        dict: Names of test functions found out of test class
+              and [class name, test name, decorator, timeout,
+              parametrized] of tests.
+    """
+    functions, classes = read_from_module(module)
+    entry = {'functions': [], 'tests': []}
+
+    for function in functions:
+        if function.name.startswith('test_'):
+            entry['functions'].append(function.name)
+
+    for class_ in classes:
+        class_timeout = get_timeout(class_)
+        methods = [n for n in class_.body if isinstance(n, ast.FunctionDef)]
+        for method in methods:
+            if not method.name.startswith('test_'):
+                continue
+
+            decorator = None
+            if method.decorator_list:
+                decorator = getattr(method.decorator_list[0], 'id', None)
+
+            timeout = get_timeout(method)
+            if timeout is None:
+                timeout = class_timeout
+
+            entry['tests'].append([class_.name, method.name,
+                                   decorator, timeout,
+                                   is_parametrized(method)])
+
+    return entry
+
+
+def scan_modules(modules: list[str],
+                 scan: Callable[[str], dict] = scan_module
+                 ) -> list[dict]:
+    """
+    Parses modules, fanned out over a process pool when
+    there are many of them. Entries are returned in
+    the same order as given modules.
+
+    Args:
+        modules (list[str]): Module paths relative to root folder.
+        scan (Callable, optional): Function parsing single module.
+
+    Returns:
+        list[dict]: Entries of scan function for each module.
+    """
+    processes = min(multiprocess.cpu_count(), len(modules))
+
+    if len(modules) < PARALLEL_SCAN_MIN or processes == 1:
+        return [scan(module) for module in modules]
+
+    chunksize = max(len(modules) // (processes * 4), 1)
+
+    with multiprocess.Pool(processes) as pool:
+        return pool.map(scan, modules, chunksize)
+
+
+def create_tree(decor: str, use_cache: bool = True) -> list[TestMethod]:
     """
     Searches for test functions in given test modules.
+    Modules unchanged since the last run are read
+    from discovery cache, the rest is parsed in parallel.
+
+    Args:
+        decor (str): Decorator name, decorators are
+                     recorded only when given.
+        use_cache (bool, optional): Use discovery cache.
 
     Returns:
-        list[str]: List of module names along
-                    with their test functions.
+        list[TestMethod]: Test methods of all modules.
     """
     test_tree = []
     gen = infinite_sequence()
+    cache = DiscoveryCache() if use_cache else None
+
+    modules = get_test_modules()
+    entries = [cache.get(module) if cache else None for module in modules]
+    missing = [module for module, entry in zip(modules, entries) if not entry]
 
-    for module in get_test_modules():
+    scanned = dict(zip(missing, scan_modules(missing)))
+    if cache:
+        for module, entry in scanned.items():
+            cache.set(module, entry)
 
-        functions, classes = read_from_module(module)
+    for module, entry in zip(modules, entries):
 
+        entry = entry or scanned[module]
         module = module.replace(os.sep, '.').replace('.py', '')
-        dict = {}
-        dict[module] = []
 
         # If test function detected raise exception.
-        for function in functions:
-            if function.name.startswith('test_'):
-                raise TestOutOfClassError(function.name)
+        for function in entry['functions']:
+            raise TestOutOfClassError(function)
 
         # Search for tests in test classes.
-        for class_ in classes:
-            methods = [n for n in class_.body if isinstance(n, ast.FunctionDef)]
-            for method in methods:
-                if not method.name.startswith('test_'):
-                    continue
-
-                tempdec = None
-                if decor:
-                    if method.decorator_list:
-                        # print(method.decorator_list[0].id)
-                        tempdec = method.decorator_list[0].id
-                test_method = TestMethod(module, class_.name, method.name, next(gen), tempdec)
-                test_tree.append(test_method)
+        for (class_name, test_name, decorator,
+             timeout, parametrized) in entry['tests']:
+            tempdec = decorator if decor else None
+            test_method = TestMethod(module, class_name, test_name, next(gen), tempdec, timeout, parametrized)
+            test_tree.append(test_method)
+
+    if cache:
+        cache.save()
 
     return test_tree
+
+
+def get_module_name(module: str) -> str:
+    """
+    Args:
+        module (str): Module path relative to root folder.
+
+    Returns:
+        str: Dotted module name, package name for __init__.py.
+    """
+    name = module[:-len('.py')].replace(os.sep, '.')
+    if name.endswith('.__init__'):
+        name = name[:-len('.__init__')]
+    return name
+
+
+def get_project_modules() -> list[str]:
+    """
+    Searches for all Python modules in root folder,
+    hidden and excluded folders are skipped.
+
+    Returns:
+        list[str]: Module paths relative to root folder.
+    """
+    modules = []
+
+    for root, dirs, files in os.walk(ROOT_DIR):
+        dirs[:] = sorted(d for d in dirs
+                         if d not in EXCLUDED_DIRS and not d.startswith('.'))
+        for file_name in sorted(files):
+            if file_name.endswith('.py'):
+                path = os.path.join(root, file_name)
+                modules.append(os.path.relpath(path, ROOT_DIR))
+
+    return modules
+
+
+def scan_imports(module: str) -> dict:
+    """
+    Parses module and picks out names of all modules
+    it imports, including imports inside functions.
+    Relative imports are resolved to absolute names.
+
+    Args:
+        module (str): Module path relative to root folder.
+
+    Returns:
+        dict: Sorted names of imported modules.
+    """
+    try:
+        with open(os.path.join(ROOT_DIR, module), encoding='utf-8') as file:
+            node = ast.parse(file.read())
+    except (SyntaxError, UnicodeDecodeError, ValueError):
+        return {'imports': []}
+
+    name = get_module_name(module)
+    package = name.split('.')
+    if not module.endswith('__init__.py'):
+        package = package[:-1]
+
+    imports: Set[str] = set()
+    for item in ast.walk(node):
+        if isinstance(item, ast.Import):
+            imports.update(alias.name for alias in item.names)
+
+        elif isinstance(item, ast.ImportFrom):
+            parts = []
+            if item.level:
+                parts = package[:len(package) - item.level + 1]
+            base = '.'.join(parts + ([item.module] if item.module else []))
+            if base:
+                imports.add(base)
+            # Names imported from package may be its submodules.
+            imports.update('.'.join(filter(None, (base, alias.name)))
+                           for alias in item.names if alias.name != '*')
+
+    return {'imports': sorted(imports)}
+
+
+class ImportGraph(object):
+    """
+    Graph of imports between project modules built from
+    their ASTs. Import lists are cached the same way as
+    discovered tests, so only changed modules are parsed.
+    """
+    def __init__(self, use_cache: bool = True) -> None:
+        """
+        Args:
+            use_cache (bool, optional): Use import cache.
+        """
+        # Imported name, and each of its parent packages,
+        # mapped to names of modules importing it.
+        self.importers: Dict[str, Set[str]] = {}
+        cache = DiscoveryCache(name='imports.json') if use_cache else None
+
+        modules = get_project_modules()
+        entries = [cache.get(module) if cache else None for module in modules]
+        missing = [module for module, entry in zip(modules, entries)
+                   if not entry]
+        scanned = dict(zip(missing, scan_modules(missing, scan_imports)))
+
+        for module, entry in zip(modules, entries):
+            if entry is None:
+                entry = scanned[module]
+                if cache:
+                    cache.set(module, entry)
+
+            name = get_module_name(module)
+            for imported in entry['imports']:
+                parts = imported.split('.')
+                for index in range(1, len(parts) + 1):
+                    key = '.'.join(parts[:index])
+                    self.importers.setdefault(key, set()).add(name)
+
+        if cache:
+            cache.save()
+
+    def impacted(self, changed: Iterable[str]) -> Set[str]:
+        """
+        Args:
+            changed (Iterable[str]): Names of changed modules.
+
+        Returns:
+            Set[str]: Changed modules and all modules
+            which import them, directly or transitively.
+        """
+        impacted = set(changed)
+        queue = deque(impacted)
+
+        while queue:
+            for importer in self.importers.get(queue.popleft(), ()):
+                if importer not in impacted:
+                    impacted.add(importer)
+                    queue.append(importer)
+
+        return impacted
+
+
+def get_changed_files(base: str = 'HEAD') -> List[str]:
+    """
+    Lists files changed in working tree compared
+    to given revision, untracked files included.
+
+    Args:
+        base (str, optional): Git revision to compare to.
+
+    Raises:
+        subprocess.CalledProcessError: When git command fails.
+
+    Returns:
+        List[str]: Absolute paths of changed files.
+    """
+    commands = [['git', 'diff', '--name-only', '--relative', base],
+                ['git', 'ls-files', '--others', '--exclude-standard']]
+    files = []
+
+    for command in commands:
+        output = subprocess.run(command, cwd=ROOT_DIR, capture_output=True,
+                                text=True, check=True).stdout
+        files.extend(os.path.join(ROOT_DIR, path)
+                     for path in output.splitlines())
+    return files
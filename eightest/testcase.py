@@ -1,3 +1,5 @@
+import functools
+
 from enum import Enum, auto
 from typing import Optional, Tuple
 
@@ -21,6 +23,8 @@ class MetaTestCase(type):
             attrs (dict): Attributes of invoking class
         """
         def replaced_func(fn):
+            # Keeps attributes set by decorators, e.g. parameters.
+            @functools.wraps(fn)
             def new_test(*args, **kwargs):
                 args[0].before()
                 result = fn(*args, **kwargs)
@@ -53,6 +57,9 @@ class TestCase(metaclass=MetaTestCase):
     """
     An individual Test Case.
     """
+    # Overrides PROCESS_TIMEOUT for all tests of the class,
+    # read during discovery so it must be a number literal.
+    TIMEOUT: Optional[float] = None
 
     def __init__(self, name) -> None:
         self.name = name
@@ -61,6 +68,22 @@ class TestCase(metaclass=MetaTestCase):
         self._status: Status = Status.PASSED
         self._reruns: int = 0
 
+    @classmethod
+    def before_class(cls) -> None:
+        """
+        Overridable, execute once before tests of the class
+        run in a process, e.g. to launch a browser.
+        """
+        pass
+
+    @classmethod
+    def after_class(cls) -> None:
+        """
+        Overridable, execute once no more tests of
+        the class are left for the process.
+        """
+        pass
+
     def before(self) -> None:
         """
         Overridable, execute before test part.
@@ -0,0 +1,180 @@
+import psutil
+
+from typing import Optional, Tuple
+
+
+# Linux status file with peak resident set size of the process.
+STATUS_PATH = '/proc/self/status'
+# Writing "5" to it resets the peak to the current size.
+CLEAR_REFS_PATH = '/proc/self/clear_refs'
+
+
+class ResourceUsage(object):
+    """
+    Resources consumed by a test, including all its runs.
+    Values the platform does not provide are None.
+    """
+    def __init__(self,
+                 user_time: float = 0.0,
+                 system_time: float = 0.0,
+                 peak_rss: Optional[int] = None,
+                 read_bytes: Optional[int] = None,
+                 write_bytes: Optional[int] = None,
+                 voluntary_switches: int = 0,
+                 involuntary_switches: int = 0
+                 ) -> None:
+        """
+        Args:
+            user_time (float, optional): CPU time in user mode in seconds.
+            system_time (float, optional): CPU time in kernel mode.
+            peak_rss (int | None, optional): Peak resident set size in bytes.
+            read_bytes (int | None, optional): Bytes read from storage.
+            write_bytes (int | None, optional): Bytes written to storage.
+            voluntary_switches (int, optional): Context switches while
+            waiting for resources.
+            involuntary_switches (int, optional): Context switches forced
+            by scheduler, high numbers mean CPU contention.
+        """
+        self.user_time = user_time
+        self.system_time = system_time
+        self.peak_rss = peak_rss
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+        self.voluntary_switches = voluntary_switches
+        self.involuntary_switches = involuntary_switches
+
+    def astuple(self) -> Tuple:
+        """
+        Returns:
+            Tuple: Compact form sent from test process,
+            in order of constructor arguments.
+        """
+        return (self.user_time,
+                self.system_time,
+                self.peak_rss,
+                self.read_bytes,
+                self.write_bytes,
+                self.voluntary_switches,
+                self.involuntary_switches)
+
+    def serialize(self) -> dict:
+        """
+        Returns:
+            dict: JSON serializable form of the usage.
+        """
+        return {
+            "user_time": self.user_time,
+            "system_time": self.system_time,
+            "peak_rss": self.peak_rss,
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+            "voluntary_switches": self.voluntary_switches,
+            "involuntary_switches": self.involuntary_switches
+        }
+
+    def describe(self) -> str:
+        """
+        Returns:
+            str: Human readable summary of the usage.
+        """
+        return (f"CPU: {self.user_time}s/{self.system_time}s " +
+                f"Peak RSS: {format_bytes(self.peak_rss)} " +
+                f"I/O: {format_bytes(self.read_bytes)}/" +
+                f"{format_bytes(self.write_bytes)} " +
+                f"Switches: {self.voluntary_switches}/" +
+                f"{self.involuntary_switches}")
+
+
+class UsageMeter(object):
+    """
+    Measures resources consumed by the current process
+    between start and stop, so that long-lived worker
+    reports each of its tests separately. Peak RSS is
+    reset at start where the platform allows it,
+    otherwise it is the peak of the whole process.
+    """
+    def __init__(self) -> None:
+        self._process = psutil.Process()
+        self._start: Tuple = ()
+
+    def start(self) -> None:
+        """
+        Takes snapshot of process counters.
+        """
+        try:
+            with open(CLEAR_REFS_PATH, 'w') as file:
+                file.write('5')
+        except OSError:
+            pass
+
+        self._start = self._sample()
+
+    def stop(self) -> ResourceUsage:
+        """
+        Returns:
+            ResourceUsage: Resources consumed since start.
+        """
+        user, system, voluntary, involuntary, read, write = self._sample()
+        (start_user, start_system, start_voluntary, start_involuntary,
+         start_read, start_write) = self._start
+
+        return ResourceUsage(
+            round(user - start_user, 3),
+            round(system - start_system, 3),
+            self._peak_rss(),
+            None if read is None else read - start_read,
+            None if write is None else write - start_write,
+            voluntary - start_voluntary,
+            involuntary - start_involuntary)
+
+    def _sample(self) -> Tuple:
+        """
+        Returns:
+            Tuple: CPU times, context switches and I/O
+            bytes, the latter None if not available.
+        """
+        times = self._process.cpu_times()
+        switches = self._process.num_ctx_switches()
+        try:
+            io = self._process.io_counters()
+            read, write = io.read_bytes, io.write_bytes
+        except (AttributeError, psutil.AccessDenied):
+            read = write = None
+
+        return (times.user, times.system,
+                switches.voluntary, switches.involuntary,
+                read, write)
+
+    def _peak_rss(self) -> Optional[int]:
+        """
+        Returns:
+            int | None: Peak resident set size in bytes.
+        """
+        try:
+            with open(STATUS_PATH) as file:
+                for line in file:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+
+        memory = self._process.memory_info()
+        return getattr(memory, 'peak_wset', memory.rss)
+
+
+def format_bytes(size: Optional[int]) -> str:
+    """
+    Args:
+        size (int | None): Number of bytes.
+
+    Returns:
+        str: Size with binary unit, "-" if unknown.
+    """
+    if size is None:
+        return '-'
+
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            break
+        size /= 1024
+    return f'{size:.1f} {unit}' if unit != 'B' else f'{size} B'
@@ -4,9 +4,14 @@ import multiprocess
 
 from datetime import datetime
 
-ROOT_DIR = pathlib.Path(__file__).resolve().parent.parent
+# Env variable pointing to other project root, e.g. synthetic benchmark tree.
+ROOT_ENV = 'EIGHTEST_ROOT'
+ROOT_DIR = pathlib.Path(os.getenv(ROOT_ENV) or
+                        pathlib.Path(__file__).parent.parent).resolve()
 
 DOTENV_PATH = os.path.join(ROOT_DIR, 'config.env')
+CACHE_DIR = os.path.join(ROOT_DIR, '.eightest_cache')
+DATABASE_PATH = os.path.join(ROOT_DIR, 'logs', 'history.sqlite3')
 env = os.environ
 
 
@@ -0,0 +1,85 @@
+import time
+import heapq
+import itertools
+
+from typing import Callable, List, Tuple
+from threading import Condition, RLock, Thread
+from eightest.testcase import Status
+
+
+class Watchdog(Thread):
+    """
+    Thread enforcing timeouts of running tasks. Keeps
+    min-heap of deadlines and wakes up only when the
+    earliest one passes or a new earliest one is added.
+    """
+    def __init__(self, on_expire: Callable) -> None:
+        """
+        Args:
+            on_expire (Callable): Called with task still
+            running when its deadline passes.
+        """
+        Thread.__init__(self, name='Watchdog', daemon=True)
+        # Held by watchdog when expiring tasks, runner holds
+        # it while handling results so both do not overlap.
+        self.lock = RLock()
+        self._on_expire = on_expire
+        self._heap: List[Tuple[float, int, float, object]] = []
+        self._counter = itertools.count()
+        self._condition = Condition()
+        self._stopped = False
+
+    def watch(self, task, timeout: float) -> None:
+        """
+        Adds deadline of task which has just started.
+
+        Args:
+            task (Task): Running task.
+            timeout (float): Time after which the task expires.
+        """
+        with self._condition:
+            heapq.heappush(self._heap, (task.duration + timeout,
+                                        next(self._counter),
+                                        task.duration,
+                                        task))
+            if self._heap[0][3] is task:
+                self._condition.notify()
+
+    def run(self) -> None:
+        """
+        Waits for the earliest deadline and expires tasks
+        which are still running. Deadlines of tasks already
+        finished or started again are skipped.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    timeout = None
+                    if self._heap:
+                        timeout = self._heap[0][0] - time.perf_counter()
+                        if timeout <= 0:
+                            break
+                    self._condition.wait(timeout)
+
+                if self._stopped:
+                    return
+
+                expired = []
+                now = time.perf_counter()
+                while self._heap and self._heap[0][0] <= now:
+                    expired.append(heapq.heappop(self._heap))
+
+            with self.lock:
+                for _, _, start, task in expired:
+                    if (task.result.status is Status.RUNNING
+                       and task.duration == start):
+                        self._on_expire(task)
+
+    def stop(self) -> None:
+        """
+        Stops the thread and drops all deadlines.
+        """
+        with self._condition:
+            self._stopped = True
+            self._heap.clear()
+            self._condition.notify()
@@ -0,0 +1,65 @@
+import os
+import importlib
+import multiprocess
+
+from traceback import format_exc
+from typing import Iterable
+from multiprocess.context import BaseContext
+from multiprocess.process import BaseProcess
+
+
+# Env variable with comma separated modules to be preloaded.
+PRELOAD_ENV = 'EIGHTEST_PRELOAD'
+
+
+def get_context(modules: Iterable[str]) -> BaseContext:
+    """
+    Returns context whose processes are forked from a zygote
+    (forkserver) process which has already imported eightest
+    and given test modules. Falls back to default context
+    where forkserver is not available.
+
+    Args:
+        modules (Iterable[str]): Test module paths to preload.
+
+    Returns:
+        BaseContext: Multiprocess context.
+    """
+    if 'forkserver' not in multiprocess.get_all_start_methods():
+        return multiprocess.get_context()
+
+    os.environ[PRELOAD_ENV] = ','.join(sorted(set(modules)))
+    context = multiprocess.get_context('forkserver')
+    context.set_forkserver_preload(['eightest.preload'])
+    return context
+
+
+def bind(process: BaseProcess, context: BaseContext) -> BaseProcess:
+    """
+    Makes process to be started with start method of given
+    context, so S_Process and S_Worker can be forked from zygote.
+
+    Args:
+        process (BaseProcess): Process not started yet.
+        context (BaseContext): Multiprocess context.
+
+    Returns:
+        BaseProcess: The same process.
+    """
+    process._Popen = context.Process._Popen
+    return process
+
+
+def preload() -> None:
+    """
+    Imports eightest and test modules in the zygote process.
+    Module which cannot be imported is skipped and then
+    imported by each process running its tests instead.
+    """
+    importlib.import_module('eightest')
+
+    for module in filter(None, os.getenv(PRELOAD_ENV, '').split(',')):
+        try:
+            importlib.import_module(module)
+        except BaseException:
+            print(f'Zygote could not preload {module}:\n{format_exc()}')
@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import shutil
+import pathlib
+import subprocess
+
+import pytest
+
+from eightest.utilities import DOTENV_PATH, ROOT_ENV
+
+# Folder containing eightest package.
+PACKAGE_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+
+class Project(object):
+    """
+    Throwaway project root with its own config, test
+    folder, caches and logs, eightest runs inside it.
+    """
+    def __init__(self, root: pathlib.Path) -> None:
+        self.root = root
+        (root / 'tests').mkdir()
+        (root / 'tests' / '__init__.py').write_text('')
+        shutil.copy(DOTENV_PATH, root / 'config.env')
+
+    def write(self, path: str, source: str) -> None:
+        (self.root / path).write_text(source)
+
+    def run(self, *args: str, timeout: float = 120, **env: str) -> dict:
+        """
+        Runs eightest with given arguments and env variables.
+
+        Returns:
+            dict: Session report.
+        """
+        report = self.root / 'report.json'
+        subprocess.run([sys.executable, '-m', 'eightest', *args,
+                        '--report', str(report)],
+                       cwd=self.root, env=self.environ(**env),
+                       timeout=timeout, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        return json.loads(report.read_text())
+
+    def python(self, source: str, timeout: float = 60) -> str:
+        """
+        Runs Python source inside the project.
+
+        Returns:
+            str: Standard output of the script.
+        """
+        return subprocess.run([sys.executable, '-c', source],
+                              cwd=self.root, env=self.environ(),
+                              timeout=timeout, capture_output=True,
+                              text=True, check=True).stdout
+
+    def environ(self, **env: str) -> dict:
+        environ = {**os.environ, **env, ROOT_ENV: str(self.root),
+                   'RESULT_STORE': 'False'}
+        environ['PYTHONPATH'] = os.pathsep.join(
+            filter(None, (str(self.root), str(PACKAGE_DIR),
+                          os.getenv('PYTHONPATH'))))
+        return environ
+
+
+@pytest.fixture
+def project(tmp_path: pathlib.Path) -> Project:
+    return Project(tmp_path)
@@ -0,0 +1,15 @@
+import pytest
+
+from eightest.distributed import get_authkey
+
+
+def test_no_default_authkey_off_loopback(monkeypatch):
+    monkeypatch.setenv('AUTHKEY', 'NULL')
+    for host in ('0.0.0.0', '10.1.2.3'):
+        with pytest.raises(ValueError):
+            get_authkey(host)
+
+
+def test_explicit_authkey(monkeypatch):
+    monkeypatch.setenv('AUTHKEY', 'secret')
+    assert get_authkey('0.0.0.0') == b'secret'
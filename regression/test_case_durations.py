@@ -0,0 +1,60 @@
+import json
+
+TESTS = '''import time
+from eightest import TestCase, parametrize
+
+
+class TestCases(TestCase):
+    @parametrize('number', lambda: range(10))
+    def test_cases(self, number):
+        time.sleep(0.05)
+
+    def test_single(self):
+        time.sleep(0.2)
+'''
+
+
+def test_cases_recorded_as_method_total(project):
+    project.write('tests/test_cases.py', TESTS)
+    project.run('-m', 'pool')
+
+    durations = json.loads(
+        (project.root / '.eightest_cache' / 'durations.json').read_text())
+    cases = durations['tests.test_cases.TestCases.test_cases']
+    single = durations['tests.test_cases.TestCases.test_single']
+    assert cases > 2 * single
+
+
+CRASHES = '''import os
+import time
+from eightest import TestCase, timeout
+
+
+class TestCrashes(TestCase):
+    def test_crash(self):
+        os._exit(1)
+
+    @timeout(1)
+    def test_hang(self):
+        time.sleep(60)
+
+    def test_single(self):
+        time.sleep(0.2)
+'''
+
+
+def test_crashed_tests_keep_previous_duration(project):
+    project.write('tests/test_crashes.py', CRASHES)
+    path = project.root / '.eightest_cache' / 'durations.json'
+    path.parent.mkdir()
+    path.write_text(json.dumps({
+        'tests.test_crashes.TestCrashes.test_crash': 3.0,
+        'tests.test_crashes.TestCrashes.test_hang': 5.0}))
+
+    for mode in ('process', 'pool'):
+        project.run('-m', mode, MAX_RERUNS='1')
+
+        durations = json.loads(path.read_text())
+        assert durations['tests.test_crashes.TestCrashes.test_crash'] == 3.0
+        assert durations['tests.test_crashes.TestCrashes.test_hang'] == 5.0
+        assert durations['tests.test_crashes.TestCrashes.test_single'] > 0.1
@@ -0,0 +1,33 @@
+import time
+
+TESTS = '''import time
+import threading
+from eightest import TestCase
+
+
+class TestLeak(TestCase):
+    def test_leak(self):
+        threading.Thread(target=time.sleep, args=(60,)).start()
+
+    def test_ok(self):
+        pass
+'''
+
+
+def test_process_kept_alive_by_thread(project):
+    project.write('tests/test_leak.py', TESTS)
+    start = time.monotonic()
+    report = project.run('-m', 'process', timeout=30, PROCESS_TIMEOUT='3',
+                         CONCURRENCY='1')
+
+    assert time.monotonic() - start < 15
+    assert {result['status'] for result in report['results']} == {'PASSED'}
+
+
+def test_worker_kept_alive_by_thread(project):
+    project.write('tests/test_leak.py', TESTS)
+    start = time.monotonic()
+    report = project.run('-m', 'pool', timeout=30, CONCURRENCY='1')
+
+    assert time.monotonic() - start < 15
+    assert {result['status'] for result in report['results']} == {'PASSED'}
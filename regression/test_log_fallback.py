@@ -0,0 +1,23 @@
+import logging
+
+from eightest import logger
+from eightest.logger import LogWriter, S_SocketHandler
+
+
+def test_writer_over_loopback_tcp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(logger, 'UNIX_SOCKETS', False)
+    writer = LogWriter('fallback', console=False)
+    writer.start()
+    assert writer.address[0] == '127.0.0.1'
+
+    handler = S_SocketHandler(writer.address)
+    handler.test_name = 'remote_test'
+    handler.emit(logging.makeLogRecord({'msg': 'over tcp',
+                                        'levelno': logging.INFO,
+                                        'levelname': 'INFO'}))
+    handler.close()
+    writer.stop()
+
+    log = tmp_path / 'logs' / 'test_session_fallback' / 'remote_test.log'
+    assert 'over tcp' in log.read_text()
@@ -0,0 +1,10 @@
+from eightest.runner import Tasks
+
+
+def test_deferred_rerun_counted_once():
+    tasks = Tasks()
+    tasks.feed(iter(()), 2)
+    task = tasks.add(None, None, None)
+    tasks.defer(task, 60)
+
+    assert tasks.pending == 2
@@ -0,0 +1,55 @@
+import time
+
+# Fast tests, a hanging one and more fast tests, all in one class,
+# so that they are sent to the worker in a single batch.
+SOURCE = '''import time
+from eightest import TestCase, timeout
+
+
+class TestBatch(TestCase):
+{fast_before}
+    @timeout(2)
+    def test_b_hang(self):
+        time.sleep(60)
+{fast_after}
+'''
+
+FAST = '''
+    def test_{name}(self):
+        pass
+'''
+
+
+def write_batch(project) -> None:
+    project.write('tests/test_batch.py', SOURCE.format(
+        fast_before=''.join(FAST.format(name=f'a{i:02d}') for i in range(60)),
+        fast_after=''.join(FAST.format(name=f'c{i}') for i in range(5))))
+
+
+def run_batch(project) -> dict:
+    return project.run('-m', 'pool', '-b', '50', SCHEDULING='none',
+                       CONCURRENCY='1', PROCESS_TIMEOUT='5')
+
+
+def test_hang_after_fast_tests_in_batch(project):
+    write_batch(project)
+    start = time.monotonic()
+    report = run_batch(project)
+    elapsed = time.monotonic() - start
+
+    statuses = {result['test_name']: result['status']
+                for result in report['results']}
+    assert len(report['results']) == 66
+    assert statuses.pop('test_b_hang') == 'TIMEOUT'
+    assert set(statuses.values()) == {'PASSED'}
+    assert elapsed < 20
+
+
+def test_timeout_of_test_inside_batch(project):
+    write_batch(project)
+    report = run_batch(project)
+
+    hang, = [result for result in report['results']
+             if result['test_name'] == 'test_b_hang']
+    # Own @timeout(2) applies, not PROCESS_TIMEOUT of 5 seconds.
+    assert 2 <= hang['duration'] < 4
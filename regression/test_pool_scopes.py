@@ -0,0 +1,31 @@
+# Hanging test and many classes, each exhausted by its only test,
+# so that scope releases are sent while the hanging test runs.
+SOURCE = '''import time
+from eightest import TestCase, timeout
+
+
+class TestA(TestCase):
+    @timeout(1)
+    def test_hang(self):
+        time.sleep(60)
+
+{classes}
+'''
+
+CLASS = '''
+class TestB{number}(TestCase):
+    def test_fast(self):
+        time.sleep(0.01)
+'''
+
+
+def test_worker_killed_with_scopes_released(project):
+    project.write('tests/test_scopes.py', SOURCE.format(
+        classes=''.join(CLASS.format(number=i) for i in range(200))))
+    report = project.run('-m', 'pool', SCHEDULING='none', CONCURRENCY='2',
+                         MAX_RERUNS='1')
+
+    statuses = [result['status'] for result in report['results']]
+    assert len(statuses) == 201
+    assert statuses.count('TIMEOUT') == 1
+    assert statuses.count('PASSED') == 200
@@ -0,0 +1,54 @@
+# Starts S_Process, waits until it has reported its result
+# and released the semaphore, then terminates it anyway.
+SOURCE = '''
+from multiprocess import Pipe, Semaphore
+from eightest.process import S_Process
+from eightest.utilities import get_time, load_env_file
+
+load_env_file()
+
+semaphore = Semaphore(1)
+parent_conn, child_conn = Pipe()
+process = S_Process(target=lambda: None, test_name='test_done',
+                    session_time=get_time(), semaphore=semaphore,
+                    pipe_conn=child_conn, max_runs=1)
+process.start()
+parent_conn.recv()
+parent_conn.recv()
+process.join()
+process.terminate()
+print(semaphore.get_value())
+'''
+
+
+def test_terminate_after_release(project):
+    assert project.python(SOURCE).strip() == '1'
+
+
+TESTS = '''import time
+from eightest import TestCase, timeout
+
+
+class TestHang(TestCase):
+    @timeout(1)
+    def test_a_hang(self):
+        time.sleep(60)
+
+    def test_b(self):
+        pass
+
+    def test_c(self):
+        pass
+'''
+
+
+def test_slot_freed_after_timeout(project):
+    project.write('tests/test_hang.py', TESTS)
+    report = project.run('-m', 'process', timeout=30, SCHEDULING='none',
+                         CONCURRENCY='1', MAX_RERUNS='1')
+
+    statuses = {result['test_name']: result['status']
+                for result in report['results']}
+    assert statuses == {'test_a_hang': 'TIMEOUT',
+                        'test_b': 'PASSED',
+                        'test_c': 'PASSED'}
@@ -0,0 +1,9 @@
+from eightest.database import ResultStore
+
+
+def test_sessions_started_in_same_second(tmp_path):
+    path = str(tmp_path / 'history.sqlite3')
+    first, second = ResultStore(path), ResultStore(path)
+
+    assert (first.begin_session('2026-01-01__00-00-00', 'pool', 1)
+            != second.begin_session('2026-01-01__00-00-00', 'pool', 1))
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from eightest.report import merge_reports
+
+TESTS = '''from eightest import TestCase
+
+
+class TestShard(TestCase):
+{tests}
+'''
+
+TEST = '''
+    def test_{number}(self):
+        pass
+'''
+
+
+def run_shards(project, durations: dict = None) -> list:
+    project.write('tests/test_shard.py', TESTS.format(
+        tests=''.join(TEST.format(number=i) for i in range(7))))
+    args = []
+    if durations is not None:
+        project.write('durations.json', json.dumps(durations))
+        args = ['--durations', str(project.root / 'durations.json')]
+
+    return [project.run('-m', 'pool', '--shard', f'{index}/2', *args,
+                        SCHEDULING='none')
+            for index in (1, 2)]
+
+
+def test_shards_cover_all_tests(project):
+    # Local history must not affect the split.
+    (project.root / '.eightest_cache').mkdir()
+    project.write('.eightest_cache/durations.json',
+                  '{"tests.test_shard.TestShard.test_0": 100}')
+    reports = run_shards(project)
+
+    assert [len(report['results']) for report in reports] == [4, 3]
+    assert len(merge_reports(reports)['results']) == 7
+
+
+def test_shards_by_durations_file(project):
+    keys = [f'tests.test_shard.TestShard.test_{i}' for i in range(7)]
+    reports = run_shards(project, {key: 10 if key == keys[0] else 0.1
+                                   for key in keys})
+
+    assert [result['test_key']
+            for result in reports[0]['results']] == [keys[0]]
+    assert len(merge_reports(reports)['results']) == 7
+
+
+def test_merge_fails_on_missing_or_repeated_shard(project):
+    first, second = run_shards(project)
+
+    with pytest.raises(ValueError):
+        merge_reports([first])
+    with pytest.raises(ValueError):
+        merge_reports([first, first, second])
+
+
+def test_merge_fails_on_test_in_two_shards(project):
+    first, second = run_shards(project)
+    second['tests'].append(first['tests'][0])
+
+    with pytest.raises(ValueError):
+        merge_reports([first, second])
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+from eightest import TestCase
+from eightest.events import EventStream, render_events
+
+
+class TestEventStream(TestCase):
+
+    def before(self):
+        self.events = EventStream(size=3)
+        for number in range(5):
+            self.events.publish('result', {"number": number})
+
+    def test_resume_after_cursor(self):
+        events, lost = self.events.read(4, timeout=0)
+
+        assert [event["id"] for event in events] == [5]
+        assert events[0]["data"] == {"number": 4}
+        assert not lost
+
+    def test_events_before_retained_ones_lost(self):
+        events, lost = self.events.read(0, timeout=0)
+
+        assert [event["id"] for event in events] == [3, 4, 5]
+        assert lost
+        assert not self.events.read(2, timeout=0)[1]
+
+    def test_nothing_after_last_event(self):
+        assert self.events.read(5, timeout=0.05) == ([], False)
+
+    def test_reader_woken_by_publish(self):
+        timer = threading.Timer(0.05, self.events.publish, ('end', {}))
+        timer.start()
+        events, _ = self.events.read(5, timeout=5)
+        timer.join()
+
+        assert [event["type"] for event in events] == ['end']
+
+    def test_async_reader_woken_by_publish(self):
+        async def read():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, threading.Thread(
+                target=self.events.publish, args=('end', {})).start)
+            return await self.events.aread(5, timeout=5)
+
+        events, _ = asyncio.run(read())
+
+        assert [event["id"] for event in events] == [6]
+
+    def test_snapshot_precedes_events_after_loss(self):
+        events, lost = self.events.read(0, timeout=0)
+        message, sequence = render_events(events, lost,
+                                          lambda: {"done": 2}, 0)
+
+        assert sequence == 5
+        assert message.startswith('id: 2\nevent: snapshot\n'
+                                  'data: {"done": 2}\n\n')
+        assert message.count('event: result') == 3
+
+    def test_keepalive_without_events(self):
+        assert render_events([], False, dict, 5) == (': keepalive\n\n', 5)
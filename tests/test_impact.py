@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+
+from eightest import TestCase, searcher
+from eightest.searcher import ImportGraph, get_module_name, scan_imports
+
+# Modules of throwaway project the import graph is built from.
+PROJECT = {
+    os.path.join('app', '__init__.py'): '',
+    os.path.join('app', 'base.py'): '',
+    os.path.join('app', 'util.py'): 'from . import base\n',
+    os.path.join('app', 'other.py'): 'import json\n',
+    os.path.join('tests', 'test_util.py'): 'from app.util import helper\n',
+    os.path.join('tests', 'test_other.py'): 'import app.other\n',
+    os.path.join('tests', 'test_late.py'): ('def load():\n'
+                                            '    from app import base\n'),
+}
+
+
+class TestImpact(TestCase):
+
+    def before(self):
+        self.root_dir = searcher.ROOT_DIR
+        searcher.ROOT_DIR = tempfile.mkdtemp(prefix='eightest-')
+        for module, source in PROJECT.items():
+            path = os.path.join(searcher.ROOT_DIR, module)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(source)
+        self.graph = ImportGraph(use_cache=False)
+
+    def after(self):
+        shutil.rmtree(searcher.ROOT_DIR, ignore_errors=True)
+        searcher.ROOT_DIR = self.root_dir
+
+    def test_module_names(self):
+        assert get_module_name(os.path.join('app', 'util.py')) == 'app.util'
+        assert get_module_name(os.path.join('app', '__init__.py')) == 'app'
+
+    def test_relative_imports_resolved(self):
+        imports = scan_imports(os.path.join('app', 'util.py'))['imports']
+
+        assert imports == ['app', 'app.base']
+
+    def test_importers_transitively_impacted(self):
+        assert self.graph.impacted({'app.base'}) == {
+            'app.base', 'app.util', 'tests.test_util', 'tests.test_late'}
+
+    def test_unrelated_modules_not_impacted(self):
+        assert self.graph.impacted({'app.other'}) == {
+            'app.other', 'tests.test_other'}
+        assert self.graph.impacted({'tests.test_util'}) == {'tests.test_util'}
+
+    def test_package_change_impacts_its_importers(self):
+        impacted = self.graph.impacted({'app'})
+
+        assert {'tests.test_util', 'tests.test_other',
+                'tests.test_late'} <= impacted
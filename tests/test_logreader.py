@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+
+from eightest import TestCase
+from eightest.logreader import LogReader, resolve_log
+
+
+class TestLogReader(TestCase):
+
+    def before(self):
+        self.folder = tempfile.mkdtemp(prefix='eightest-')
+        self.path = os.path.join(self.folder, 'test.log')
+        self.write(b''.join(b'line %d\n' % number for number in range(10)))
+        self.reader = LogReader(self.path)
+
+    def after(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, data: bytes, mode: str = 'wb') -> None:
+        with open(self.path, mode) as file:
+            file.write(data)
+
+    def test_head_pages_forward(self):
+        first = self.reader.head(4)
+        second = self.reader.since(first.end, 4)
+
+        assert first.lines == ['line 0', 'line 1', 'line 2', 'line 3']
+        assert (first.start, first.end) == (0, 28)
+        assert second.lines == ['line 4', 'line 5', 'line 6', 'line 7']
+        assert second.start == first.end
+
+    def test_follow_leaves_unfinished_line(self):
+        end = self.reader.head().end
+        self.write(b'line 10\nline 1', 'ab')
+        window = self.reader.since(end)
+
+        assert window.lines == ['line 10']
+        assert self.reader.since(window.end).lines == []
+
+        self.write(b'1\n', 'ab')
+        assert self.reader.since(window.end).lines == ['line 11']
+
+    def test_tail_pages_backward(self):
+        last = self.reader.tail(3)
+        previous = self.reader.before(last.start, 3)
+
+        assert last.lines == ['line 7', 'line 8', 'line 9']
+        assert last.end == last.size
+        assert previous.lines == ['line 4', 'line 5', 'line 6']
+        assert previous.end == last.start
+        assert self.reader.before(0).lines == []
+
+    def test_tail_skips_unfinished_line(self):
+        self.write(b'line 1', 'ab')
+
+        assert self.reader.tail(1).lines == ['line 9']
+
+    def test_windows_limited_in_bytes(self):
+        reader = LogReader(self.path, max_bytes=16)
+
+        assert reader.head().lines == ['line 0', 'line 1']
+        assert reader.tail().lines == ['line 8', 'line 9']
+
+    def test_overlong_line_split(self):
+        self.write(b'x' * 40 + b'\n')
+        reader = LogReader(self.path, max_bytes=16)
+        window = reader.head()
+
+        assert window.lines == ['x' * 16]
+        assert window.end == 16
+        assert reader.tail().lines == ['x' * 15]
+
+    def test_negative_offset_rejected(self):
+        for read in (self.reader.since, self.reader.before):
+            rejected = False
+            try:
+                read(-1)
+            except ValueError:
+                rejected = True
+            assert rejected
+
+    def test_truncated_log_resets_window(self):
+        end = self.reader.head().end
+        self.write(b'new\n')
+        window = self.reader.since(end)
+
+        assert window.reset
+        assert (window.lines, window.start, window.end) == (['new'], 0, 4)
+        assert not self.reader.since(window.end).reset
+
+    def test_path_outside_logs_rejected(self):
+        assert resolve_log(self.folder, '.', 'test.log') == \
+            os.path.realpath(self.path)
+
+        rejected = False
+        try:
+            resolve_log(self.folder, '..', 'test.log')
+        except FileNotFoundError:
+            rejected = True
+        assert rejected
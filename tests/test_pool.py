@@ -0,0 +1,138 @@
+from collections import deque
+
+import eightest.pool
+
+from eightest import TestCase
+from eightest.pool import BatchSizer, WorkerPool
+from eightest.searcher import TestMethod
+
+
+class FakeTask(object):
+    """
+    Stands for runner's task, pool only looks at its test,
+    connection and start time.
+    """
+    def __init__(self, connection: object, value: int) -> None:
+        self.connection = connection
+        self.test_method = TestMethod('tests.fake', 'TestFake',
+                                      f'test_{value}', value)
+        self.duration = None
+        self.expired = False
+        self.runs = 0
+
+    def expire(self) -> None:
+        self.expired = True
+
+
+def busy_pool(conn: object, batch: list) -> WorkerPool:
+    pool = WorkerPool(0, {}, 'session')
+    pool.busy[conn] = deque(batch)
+    pool._progress[conn] = 0.0
+    return pool
+
+
+class TestWorkerPool(TestCase):
+
+    def before(self):
+        self.conn = object()
+        self.first, self.second, self.third = (
+            FakeTask(self.conn, value) for value in range(3))
+
+    def test_death_charged_to_running_task(self):
+        pool = busy_pool(self.conn, [self.first, self.second, self.third])
+
+        assert pool._died(self.conn) == [(self.first, None)]
+        assert pool.orphaned == [self.second, self.third]
+        assert self.conn not in pool.busy
+
+    def test_kill_charges_running_task(self):
+        pool = busy_pool(self.conn, [self.first, self.second])
+        pool.kill(self.first)
+
+        assert self.first.expired
+        assert pool._died(self.conn) == [(self.first, None)]
+        assert pool.orphaned == [self.second]
+
+    def test_kill_of_finished_task_charges_nobody(self):
+        # Result of the killed task arrived before the worker died.
+        pool = busy_pool(self.conn, [self.second, self.third])
+        pool.kill(self.first)
+
+        assert pool._died(self.conn) == []
+        assert pool.orphaned == [self.second, self.third]
+
+    def test_death_of_idle_worker_charges_nobody(self):
+        pool = busy_pool(self.conn, [])
+
+        assert pool._died(self.conn) == []
+        assert pool.orphaned == []
+
+    def test_result_of_other_test_rejected(self):
+        pool = busy_pool(self.conn, [self.first])
+
+        rejected = False
+        try:
+            pool._unpack(self.conn, [(1, 1, 0.1, 1, None)])
+        except ValueError:
+            rejected = True
+        assert rejected
+
+
+class TestBatching(TestCase):
+
+    def before(self):
+        self.conn = object()
+        self.tasks = [FakeTask(self.conn, value) for value in range(3)]
+
+    def test_single_test_batches_until_observed(self):
+        assert BatchSizer(1).size(100, 1) == 1
+        assert BatchSizer(50).size(100, 1) == 1
+
+    def test_batch_fills_target_time(self):
+        sizer = BatchSizer(50)
+        sizer.observe(0.01, 10)
+
+        assert sizer.size(1000, 1) == int(BatchSizer.TARGET / 0.001)
+
+    def test_batch_limited_by_maximum_and_pending(self):
+        sizer = BatchSizer(20)
+        sizer.observe(0.0001, 10)
+
+        assert sizer.size(1000, 2) == 20
+        # Remaining tests are shared by all workers.
+        assert sizer.size(10, 2) == 5
+        assert sizer.size(1, 2) == 1
+
+    def test_observations_smoothed(self):
+        sizer = BatchSizer(50)
+        sizer.observe(0.1, 1)
+        sizer.observe(0.0, 1)
+
+        assert abs(sizer.per_test - 0.1 * (1 - BatchSizer.SMOOTHING)) < 1e-9
+
+    def test_items_of_first_runs_reruns_and_cases(self):
+        # Called through module, name of the function looks like a test.
+        first, rerun, case = self.tasks
+        rerun.runs = 1
+        case.test_method.case = 0
+
+        assert eightest.pool.test_item(first) == 0
+        assert eightest.pool.test_item(rerun) == (1, 2)
+        assert eightest.pool.test_item(case) == (2, 1, case.test_method)
+
+    def test_next_task_of_batch_begins(self):
+        pool = busy_pool(self.conn, self.tasks)
+        finished = pool._unpack(self.conn, [(0, 3, 0.1, 1, None)])
+
+        assert [task for task, _ in finished] == self.tasks[:1]
+        assert self.tasks[1].duration is not None
+        assert self.tasks[2].duration is None
+        assert self.conn in pool.busy
+
+    def test_worker_idle_after_whole_batch(self):
+        pool = busy_pool(self.conn, self.tasks)
+        finished = pool._unpack(self.conn, [(value, 3, 0.1, 1, None)
+                                            for value in range(3)])
+
+        assert [task for task, _ in finished] == self.tasks
+        assert self.conn not in pool.busy